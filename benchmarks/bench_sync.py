@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for theme lookup, theme detection and the Alacritty sync.
+Before measuring, the messages live_apply() sends are checked against a
+stand-in IPC socket and pty.
+
+    python benchmarks/bench_sync.py                  # run and print results
+    python benchmarks/bench_sync.py --save           # store as baseline
+    python benchmarks/bench_sync.py --compare        # fail on regressions
+
+HOME, the XDG directories and all file paths used by themes.py /
+sync_alacritty.py are redirected into temporary directories, so running
+this never reads or touches your real configs.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_CONFIG = os.path.join(os.path.dirname(HERE), "sample_config")
+# Machine specific, so not committed (see .gitignore)
+BASELINE = os.path.join(HERE, "baseline.json")
+# A benchmark regresses if it is this much slower than the baseline
+THRESHOLD = 0.25
+
+# themes loads ~/.config/qtile/themes.d and writes its index to ~/.cache on
+# import, so the home directory is replaced before the imports below; the
+# measure_import() interpreters get the same environment
+SANDBOX_HOME = tempfile.mkdtemp(prefix="bench_sync-home-")
+BENCH_ENV = dict(
+    os.environ,
+    HOME=SANDBOX_HOME,
+    XDG_CONFIG_HOME=os.path.join(SANDBOX_HOME, ".config"),
+    XDG_CACHE_HOME=os.path.join(SANDBOX_HOME, ".cache"),
+    XDG_STATE_HOME=os.path.join(SANDBOX_HOME, ".local", "state"),
+    XDG_RUNTIME_DIR=os.path.join(SANDBOX_HOME, "run"),
+)
+os.environ.update(BENCH_ENV)
+atexit.register(shutil.rmtree, SANDBOX_HOME, ignore_errors=True)
+
+sys.path.insert(0, SAMPLE_CONFIG)
+
+import sync_alacritty  # noqa: E402
+import themes  # noqa: E402
+from themes import Theme  # noqa: E402
+
+
+def measure(func, number: int = 1000, repeat: int = 5) -> float:
+    """Best-of-repeat time per call, in microseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings) * 1e6
+
+
+def measure_import(module: str, repeat: int = 5) -> float:
+    """Median cold import time of a module in a fresh interpreter, in us"""
+
+    def run(code):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code], cwd=SAMPLE_CONFIG, env=BENCH_ENV, check=True
+        )
+        return time.perf_counter() - start
+
+    baseline = statistics.median(run("pass") for _ in range(repeat))
+    total = statistics.median(run(f"import {module}") for _ in range(repeat))
+    return max(total - baseline, 0.0) * 1e6
+
+
+# ===== Fixtures =====
+def write_qtile_config(path: str, padding_lines: int):
+    """A config.py like sample_config's, with extra lines before the theme"""
+    with open(os.path.join(SAMPLE_CONFIG, "config.py")) as f:
+        config = f.read()
+    filler = "".join(f"# padding line {i} {'x' * 60}\n" for i in range(padding_lines))
+    with open(path, "w") as f:
+        f.write(filler + config)
+
+
+def write_alacritty_config(path: str, extra_tables: int):
+    """An alacritty.toml with a colors block and extra_tables other tables"""
+    parts = ['[font]\nsize = 11\n\n[colors.primary]\nbackground = "#000000"\n']
+    for i in range(extra_tables):
+        parts.append(f"\n# Section {i}\n[hints.section_{i}]\nkey = {i}\nname = \"x\"\n")
+    with open(path, "w") as f:
+        f.write("".join(parts))
+
+
+def isolate(tmp: str):
+    """Point every path used by the modules into tmp"""
+    themes.THEME_STATE = os.path.join(tmp, "state", "theme")
+    themes.THEME_STAMP = os.path.join(tmp, "theme_stamp.json")
+    themes.QTILE_CONFIG = os.path.join(tmp, "config.py")
+    themes.THEME_DIR = os.path.join(tmp, "themes.d")
+    themes.THEME_DIR_INDEX = os.path.join(tmp, "themes_d.json")
+    sync_alacritty.ALACRITTY_CONFIG = os.path.join(tmp, "alacritty.toml")
+    sync_alacritty.SYNC_STAMP = os.path.join(tmp, "alacritty_sync.stamp")
+    sync_alacritty.SYNC_LOCK = os.path.join(tmp, "alacritty_sync.lock")
+    sync_alacritty.THEME_CACHE_DIR = os.path.join(tmp, "alacritty-themes")
+    sync_alacritty.COLORS_LINK = os.path.join(tmp, "qtile-colors.toml")
+    sync_alacritty.SYNC_MODE = "splice"
+    sync_alacritty.LIVE_APPLY = False
+    sync_alacritty.IPC_SOCKET_GLOB = os.path.join(tmp, "Alacritty-*.sock")
+    sync_alacritty.PROC_STAT_GLOB = os.path.join(tmp, "proc", "*", "stat")
+
+
+def stand_in_alacritty(path: str, received: Optional[list] = None):
+    """Listen on path like an Alacritty IPC socket, accepting every message
+
+    The messages are appended to received, if given.
+    """
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+
+    def serve():
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                message = b""
+                while True:
+                    data = conn.recv(65536)
+                    if not data:
+                        break
+                    message += data
+            if received is not None:
+                received.append(message)
+
+    threading.Thread(target=serve, daemon=True).start()
+
+
+def stand_in_shell(tmp: str) -> int:
+    """A pty whose shell is a child of "alacritty" in a fake /proc
+
+    Returns the master fd, which reads what live_apply() writes.
+    """
+    master, slave = os.openpty()
+    rdev = os.stat(os.ttyname(slave)).st_rdev
+    major, minor = os.major(rdev), os.minor(rdev)
+    tty_nr = (major << 8) | (minor & 0xFF) | ((minor & ~0xFF) << 12)
+    for pid, comm, ppid, tty in ((100, "alacritty", 1, 0), (101, "zsh", 100, tty_nr)):
+        os.makedirs(os.path.join(tmp, "proc", str(pid)))
+        with open(os.path.join(tmp, "proc", str(pid), "stat"), "w") as f:
+            f.write(f"{pid} ({comm}) S {ppid} {pid} {pid} {tty} -1 0\n")
+    return master
+
+
+def reset_detection_cache():
+    themes._theme_name_cache.clear()
+    try:
+        os.unlink(themes.THEME_STAMP)
+    except FileNotFoundError:
+        pass
+
+
+# ===== Benchmarks =====
+def bench_get_theme() -> dict:
+    return {
+        "get_theme_hit": measure(lambda: Theme.get_theme("nord"), 100000),
+        "get_theme_display_name": measure(
+            lambda: Theme.get_theme("Solarized Light"), 100000
+        ),
+        "get_theme_miss": measure(lambda: Theme.get_theme("no-such-theme"), 100000),
+        "suggest": measure(lambda: themes.THEMES.suggest("solarised"), 1000),
+    }
+
+
+def bench_detection(tmp: str) -> dict:
+    results = {}
+    for label, padding in (("realistic", 0), ("large", 50000)):
+        write_qtile_config(themes.QTILE_CONFIG, padding)
+
+        def uncached():
+            reset_detection_cache()
+            Theme.get_current_qtile_theme()
+
+        results[f"detect_{label}_uncached"] = measure(uncached, 50)
+        results[f"detect_{label}_cached"] = measure(
+            Theme.get_current_qtile_theme, 10000
+        )
+
+    os.makedirs(os.path.dirname(themes.THEME_STATE), exist_ok=True)
+    Theme.select("nord")
+    results["detect_state_file"] = measure(Theme.get_current_qtile_theme, 10000)
+    os.unlink(themes.THEME_STATE)
+    return results
+
+
+def bench_sync(tmp: str) -> dict:
+    results = {}
+    pair = (Theme.get_theme("nord"), Theme.get_theme("dracula"))
+    for label, tables in (("small", 5), ("large", 5000)):
+        write_alacritty_config(sync_alacritty.ALACRITTY_CONFIG, tables)
+        state = {"i": 0}
+
+        def changed():
+            state["i"] += 1
+            sync_alacritty.sync(pair[state["i"] % 2])
+
+        results[f"sync_{label}_changed"] = measure(changed, 20)
+        results[f"sync_{label}_unchanged"] = measure(
+            lambda: sync_alacritty.sync(pair[0]), 200
+        )
+    return results
+
+
+def bench_live_apply(tmp: str) -> dict:
+    colors = sync_alacritty.build_alacritty_colors(Theme.get_theme("nord"))
+    for i in range(8):
+        stand_in_alacritty(os.path.join(tmp, f"Alacritty-:0-{i}.sock"))
+    return {
+        "live_apply_8_processes": measure(
+            lambda: sync_alacritty.live_apply(colors), 50
+        )
+    }
+
+
+# ===== Checks =====
+def _expect(condition: bool, what: str):
+    if not condition:
+        raise SystemExit(f"Check failed: {what}")
+
+
+def check_live_apply(tmp: str):
+    """What live_apply() sends: the IPC message, and OSC bytes without IPC"""
+    import tomllib
+
+    theme = Theme.get_theme("nord")
+    colors = sync_alacritty.build_alacritty_colors(theme)
+    received = []
+    sock = os.path.join(tmp, "Alacritty-:0-check.sock")
+    stand_in_alacritty(sock, received)
+    _expect(sync_alacritty.live_apply(colors) == 1, "live_apply reaches the socket")
+    _expect(len(received) == 1, "one IPC message per socket")
+    message = json.loads(received[0])
+    config = message["Config"]
+    _expect(
+        config["window_id"] is None and config["reset"] is False,
+        "the override applies to all windows and keeps other overrides",
+    )
+    # Every option is a dotted TOML key, together they are the colors table
+    options = tomllib.loads("\n".join(config["options"]))
+    _expect(options == colors, "the IPC options hold exactly the colors")
+    os.unlink(sock)
+
+    master = stand_in_shell(tmp)
+    _expect(sync_alacritty.live_apply(colors) == 1, "OSC fallback reaches the pty")
+    data = os.read(master, 65536).decode()
+    os.close(master)
+    table = colors["colors"]
+    palette = [table["normal"][name] for name in table["normal"]]
+    palette += [table["bright"][name] for name in table["bright"]]
+    palette += [entry["color"] for entry in table["indexed_colors"]]
+    expected = "".join(f"\033]4;{i};{c}\007" for i, c in enumerate(palette))
+    expected += f"\033]10;{theme.foreground}\007\033]11;{theme.background}\007"
+    expected += f"\033]12;{theme.primary}\007"
+    _expect(data == expected, "the OSC sequences set the palette, fg, bg, cursor")
+
+
+def run_all() -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate(tmp)
+        check_live_apply(tmp)
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate(tmp)
+        results = {}
+        results.update(bench_detection(tmp))
+        # The sync prints a line per call, get_theme one for the miss
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            results.update(bench_get_theme())
+            results.update(bench_sync(tmp))
+            results.update(bench_live_apply(tmp))
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    results["import_themes"] = measure_import("themes")
+    results["import_sync_alacritty"] = measure_import("sync_alacritty")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--save", action="store_true", help="save as baseline")
+    parser.add_argument(
+        "--compare", action="store_true", help="compare against the baseline"
+    )
+    args = parser.parse_args()
+
+    results = run_all()
+    baseline = {}
+    if args.compare:
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+
+    regressions = []
+    for name, value in results.items():
+        line = f"{name:32} {value:12.2f} us"
+        if name in baseline:
+            change = value / baseline[name] - 1
+            line += f"  {change:+7.1%}"
+            if change > THRESHOLD:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        with open(BASELINE, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {BASELINE}")
+    if regressions:
+        names = ", ".join(regressions)
+        raise SystemExit(f"Regressed by more than {THRESHOLD:.0%}: {names}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,33 @@
 import os
 import subprocess
 
-from libqtile import bar, hook, layout, widget
-from libqtile.config import Click, Drag, Group, Key, Match, Screen
-from libqtile.lazy import lazy
+# Phase timing, enabled by QTILE_TRACE=1 (see startup_trace.py)
+import startup_trace
+from startup_trace import phase, traced
 
-from key_bindings import keys
-from screen_widgets import left_widgets, right_widgets
-from themes import Theme
+startup_trace.start()
+
+# Only what module level code needs is imported here; layouts, bars and
+# widgets are imported by the functions that build them
+with phase("import libqtile"):
+    from libqtile import hook, qtile
+    from libqtile.config import Click, Drag, Group, Key
+    from libqtile.lazy import lazy
+
+with phase("import themes"):
+    from themes import Theme, on_theme_change
 
 # ===== Colour Theme =====
-theme = Theme.get_theme("interstellar")  # Change to "dracula", "nord", etc.
+# Resolved before the imports below so they pick up the recorded theme. The
+# default only applies until a theme is switched with `python themes.py <name>`
+theme = Theme.current("interstellar")  # Change to "dracula", "nord", etc.
+
+with phase("import key_bindings"):
+    from key_bindings import keys
+with phase("import screen_widgets"):
+    from screen_widgets import left_widgets, right_widgets
+with phase("import exporters"):
+    from exporters import export_theme
 
 # Theme colors
 BACKGROUND = theme.background
@@ -74,8 +91,15 @@ for i in init_groups():
 
 
 # ===== Layouts =====
+# Theme colours used by layout borders, reapplied by apply_theme()
+LAYOUT_BORDERS = {"monadtall": {"border_focus": "primary"}}
+
+
+@traced
 def init_layouts():
     """Modern layouts with subtle glow effects"""
+    from libqtile import layout
+
     return [
         layout.MonadTall(
             border_focus=PRIMARY,
@@ -97,8 +121,12 @@ def init_layouts():
 
 
 # ===== Screens & Bar =====
+@traced
 def init_screens():
     """Modern top bar with split widget alignment"""
+    from libqtile import bar, widget
+    from libqtile.config import Screen
+
     return [
         Screen(
             top=bar.Bar(
@@ -135,6 +163,9 @@ def init_mouse():
 
 # ===== Floating Windows =====
 def floating():
+    from libqtile import layout
+    from libqtile.config import Match
+
     return layout.Floating(
         float_rules=[
             *layout.Floating.default_float_rules,
@@ -149,22 +180,95 @@ def floating():
 
 # ===== Autostart =====
 @hook.subscribe.startup_once
+@traced
 def autostart():
     subprocess.Popen([os.path.expanduser("~/.config/qtile/scripts/auto_start.sh")])
 
 
+# Hardware monitors in group 9: WM_CLASS class -> command
+HARDWARE_MONITORS = {
+    "htop": "htop",
+    "btm": "btm",
+    "nvtop": "nvtop",
+}
+# Seconds between checks of the `alacritty msg` calls, and how long they get
+MSG_POLL = 0.05
+MSG_TIMEOUT = 2
+
+
+def running_monitors():
+    """Classes of the hardware monitor windows that already exist"""
+    running = set()
+    for window in qtile.windows_map.values():
+        get_wm_class = getattr(window, "get_wm_class", None)
+        wm_class = (get_wm_class() if get_wm_class else None) or []
+        if "sysmon" in wm_class:
+            running.update(wm_class)
+    return running
+
+
+def create_terminal_window(name, command):
+    """Ask the running Alacritty for a window (no new process per window)
+
+    Returns the `alacritty msg` process without waiting for it, or None if
+    it couldn't be started.
+    """
+    args = ["alacritty", "msg", "create-window", f"--class=sysmon,{name}"]
+    try:
+        return subprocess.Popen(
+            args + ["-e", *command.split()],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+
+
 @hook.subscribe.startup
-def spawn_hardware_monitors():
-    # Spawn hardware monitors in group 9
-    monitors = [
-        "alacritty --class=sysmon,htop -e htop",
-        "alacritty --class=sysmon,btm -e btm",
-        "alacritty --class=sysmon,nvtop -e nvtop",
-    ]
-    for cmd in monitors:
+@traced
+def spawn_hardware_monitors(missing=None, retries=3):
+    # Reuse monitors that survived the reload, only create the missing ones
+    if missing is None:
+        running = running_monitors()
+        missing = [name for name in HARDWARE_MONITORS if name not in running]
+    if missing:
+        pending = {
+            name: create_terminal_window(name, HARDWARE_MONITORS[name])
+            for name in missing
+        }
+        qtile.call_later(MSG_POLL, check_terminal_windows, pending, retries, 0.0)
+
+
+def check_terminal_windows(pending, retries, waited):
+    """Collect the `alacritty msg` results without blocking the event loop"""
+    running = [p for p in pending.values() if p is not None and p.poll() is None]
+    if running and waited < MSG_TIMEOUT:
+        qtile.call_later(
+            MSG_POLL, check_terminal_windows, pending, retries, waited + MSG_POLL
+        )
+        return
+    for proc in running:
+        proc.kill()
+        proc.wait()
+    failed = [name for name, p in pending.items() if p is None or p.returncode]
+    if not failed:
+        return
+    if retries == 3:
+        # No Alacritty to talk to yet: start a window-less daemon
+        try:
+            subprocess.Popen(["alacritty", "--daemon"], start_new_session=True)
+        except OSError:
+            retries = 0
+    if retries:
+        qtile.call_later(0.5, spawn_hardware_monitors, failed, retries - 1)
+        return
+    for fallback in failed:  # Daemon unavailable (old Alacritty?)
+        command = HARDWARE_MONITORS[fallback].split()
         try:
-            subprocess.Popen(cmd.split())
-        except:
+            subprocess.Popen(
+                ["alacritty", f"--class=sysmon,{fallback}", "-e", *command]
+            )
+        except OSError:
             pass
 
 
@@ -176,8 +280,25 @@ def assign_hardware_group(window):
 
 
 @hook.subscribe.startup
+@traced
 def sync_alacritty_theme():
-    subprocess.Popen([os.path.expanduser("~/.config/qtile/sync_alacritty.py")])
+    # Alacritty and every other application with an exporter
+    export_theme(theme)
+
+
+# ===== Runtime Theme Switching =====
+# Switch without reloading: python ~/.config/qtile/themes.py <name>
+@on_theme_change
+def apply_theme(new_theme):
+    """Recolour layout borders and exported apps (widgets: screen_widgets.py)"""
+    global theme
+    theme = new_theme
+    for group in qtile.groups:
+        for group_layout in group.layouts:
+            for attr, role in LAYOUT_BORDERS.get(group_layout.name, {}).items():
+                setattr(group_layout, attr, getattr(new_theme, role))
+        group.layout_all()
+    export_theme(new_theme)
 
 
 
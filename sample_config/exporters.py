@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# exporters.py
+"""
+Export the Qtile theme to other applications.
+
+Every exporter renders its colors file from the same resolved Theme and
+keeps its own stamp, so an application whose file is already current is
+skipped without writing or reloading anything. The exporters run in a
+thread pool, so syncing all of them costs about as much as the slowest.
+
+Alacritty goes through sync_alacritty.sync(). The other exporters write
+a separate colors file for their application to include, and only run
+when that application's config directory exists:
+
+    kitty       include qtile-colors.conf                   (kitty.conf)
+    rofi        @import "qtile-colors.rasi"                 (config.rasi)
+    dunst       dunstrc.d/50-qtile-colors.conf              (read by dunst)
+    xresources  #include ".Xresources.d/qtile-colors"       (~/.Xresources)
+    gtk         @import url("qtile-colors.css");            (gtk.css)
+    tmux        source-file ~/.config/tmux/qtile-colors.conf
+
+    python exporters.py [theme] [--only NAME ...]
+"""
+
+import hashlib
+import os
+import subprocess
+from typing import Dict, Iterable, List, Optional
+
+import sync_alacritty
+from themes import COLOR_FIELDS, Theme
+
+# Per exporter stamps: digest of the last rendered file and its stat
+EXPORT_STAMP_DIR = os.path.expanduser("~/.cache/qtile/exporters")
+
+KITTY_COLORS = os.path.expanduser("~/.config/kitty/qtile-colors.conf")
+ROFI_COLORS = os.path.expanduser("~/.config/rofi/qtile-colors.rasi")
+DUNST_COLORS = os.path.expanduser("~/.config/dunst/dunstrc.d/50-qtile-colors.conf")
+XRESOURCES_COLORS = os.path.expanduser("~/.Xresources.d/qtile-colors")
+GTK_COLORS = os.path.expanduser("~/.config/gtk-3.0/qtile-colors.css")
+TMUX_COLORS = os.path.expanduser("~/.config/tmux/qtile-colors.conf")
+
+# Exporters to run, None runs every registered one
+ENABLED_EXPORTERS: Optional[List[str]] = None
+
+
+class Exporter:
+    """Writes one application's colors file from a resolved Theme"""
+
+    name = ""
+    path = ""
+    # The exporter only runs if this directory exists (empty: always)
+    config_dir = ""
+    # Started (not waited for) after the file changed, so running
+    # instances re-read it
+    reload: Optional[List[str]] = None
+
+    def render(self, theme: Theme) -> str:
+        raise NotImplementedError
+
+    def installed(self) -> bool:
+        return not self.config_dir or os.path.isdir(self.config_dir)
+
+    def export(self, theme: Theme) -> bool:
+        """Write the colors file unless it is unchanged; True if written"""
+        data = self.render(theme).encode("utf-8")
+        if _read_stamp(self.name) == self._digest(data):
+            print(f"{self.name} colors already up to date with {theme.name} theme")
+            return False
+        sync_alacritty._atomic_write(self.path, data)
+        _write_stamp(self.name, self._digest(data))
+        if self.reload:
+            # Not waited for, this runs inside Qtile's event loop
+            try:
+                subprocess.Popen(
+                    self.reload,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True,
+                )
+            except OSError:
+                pass  # Not installed, picks the file up on its next start
+        print(f"Updated {self.name} colors with {theme.name} theme")
+        return True
+
+    def _digest(self, data: bytes) -> str:
+        """Hash the rendered file with the target's stat, so edits count"""
+        digest = hashlib.sha256(data)
+        try:
+            st = os.stat(self.path)
+            digest.update(f"\0{st.st_ino}:{st.st_mtime_ns}:{st.st_size}".encode())
+        except FileNotFoundError:
+            digest.update(b"\0missing")
+        return digest.hexdigest()
+
+
+def _ansi(theme: Theme):
+    from palette import ansi_palette
+
+    return ansi_palette(theme)
+
+
+def _header(comment: str, theme: Theme) -> str:
+    return f"{comment} Generated by exporters.py from the {theme.name} theme\n"
+
+
+# ===== Exporters =====
+EXPORTERS: Dict[str, Exporter] = {}
+
+
+def register(exporter_class):
+    """Class decorator adding an Exporter to EXPORTERS"""
+    EXPORTERS[exporter_class.name] = exporter_class()
+    return exporter_class
+
+
+@register
+class AlacrittyExporter(Exporter):
+    """Splices or links the [colors] tables, see sync_alacritty.py"""
+
+    name = "alacritty"
+
+    def export(self, theme: Theme) -> bool:
+        return sync_alacritty.sync(theme)
+
+
+@register
+class KittyExporter(Exporter):
+    name = "kitty"
+    path = KITTY_COLORS
+    config_dir = os.path.dirname(KITTY_COLORS)
+
+    def render(self, theme: Theme) -> str:
+        lines = [
+            f"foreground {theme.foreground}",
+            f"background {theme.background}",
+            f"selection_foreground {theme.background}",
+            f"selection_background {theme.primary}",
+            f"cursor {theme.primary}",
+            f"cursor_text_color {theme.background}",
+            f"url_color {theme.highlight}",
+            f"active_border_color {theme.primary}",
+            f"inactive_border_color {theme.secondary}",
+            f"active_tab_foreground {theme.background}",
+            f"active_tab_background {theme.primary}",
+            f"inactive_tab_foreground {theme.foreground}",
+            f"inactive_tab_background {theme.background}",
+        ]
+        lines += [f"color{i} {color}" for i, color in enumerate(_ansi(theme))]
+        return _header("#", theme) + "\n".join(lines) + "\n"
+
+
+@register
+class RofiExporter(Exporter):
+    name = "rofi"
+    path = ROFI_COLORS
+    config_dir = os.path.dirname(ROFI_COLORS)
+
+    def render(self, theme: Theme) -> str:
+        lines = [
+            f"    qtile-{field}: {getattr(theme, field)};" for field in COLOR_FIELDS
+        ]
+        return _header("//", theme) + "* {\n" + "\n".join(lines) + "\n}\n"
+
+
+@register
+class DunstExporter(Exporter):
+    name = "dunst"
+    path = DUNST_COLORS
+    config_dir = os.path.dirname(os.path.dirname(DUNST_COLORS))
+    reload = ["dunstctl", "reload"]
+
+    def render(self, theme: Theme) -> str:
+        sections = {
+            "global": {"frame_color": theme.primary, "separator_color": "frame"},
+            "urgency_low": {
+                "background": theme.background,
+                "foreground": theme.secondary,
+            },
+            "urgency_normal": {
+                "background": theme.background,
+                "foreground": theme.foreground,
+            },
+            "urgency_critical": {
+                "background": theme.background,
+                "foreground": theme.foreground,
+                "frame_color": theme.warning,
+            },
+        }
+        lines = []
+        for section, values in sections.items():
+            lines += ["", f"[{section}]"]
+            lines += [f'    {key} = "{value}"' for key, value in values.items()]
+        return _header("#", theme) + "\n".join(lines[1:]) + "\n"
+
+
+@register
+class XresourcesExporter(Exporter):
+    name = "xresources"
+    path = XRESOURCES_COLORS
+    config_dir = os.path.dirname(XRESOURCES_COLORS)
+    reload = ["xrdb", "-merge", XRESOURCES_COLORS]
+
+    def render(self, theme: Theme) -> str:
+        lines = [
+            f"*.background: {theme.background}",
+            f"*.foreground: {theme.foreground}",
+            f"*.cursorColor: {theme.primary}",
+        ]
+        lines += [f"*.color{i}: {color}" for i, color in enumerate(_ansi(theme))]
+        return _header("!", theme) + "\n".join(lines) + "\n"
+
+
+@register
+class GtkExporter(Exporter):
+    name = "gtk"
+    path = GTK_COLORS
+    config_dir = os.path.dirname(GTK_COLORS)
+
+    def render(self, theme: Theme) -> str:
+        lines = [
+            f"@define-color qtile_{field} {getattr(theme, field)};"
+            for field in COLOR_FIELDS
+        ]
+        header = f"/* Generated by exporters.py from the {theme.name} theme */\n"
+        return header + "\n".join(lines) + "\n"
+
+
+@register
+class TmuxExporter(Exporter):
+    name = "tmux"
+    path = TMUX_COLORS
+    config_dir = os.path.dirname(TMUX_COLORS)
+    reload = ["tmux", "source-file", TMUX_COLORS]
+
+    def render(self, theme: Theme) -> str:
+        styles = {
+            "status-style": f"bg={theme.background},fg={theme.foreground}",
+            "window-status-current-style": f"bg={theme.primary},fg={theme.background}",
+            "pane-border-style": f"fg={theme.secondary}",
+            "pane-active-border-style": f"fg={theme.primary}",
+            "message-style": f"bg={theme.background},fg={theme.highlight}",
+            "mode-style": f"bg={theme.primary},fg={theme.background}",
+        }
+        lines = [f'set -g {option} "{style}"' for option, style in styles.items()]
+        return _header("#", theme) + "\n".join(lines) + "\n"
+
+
+# ===== Pipeline =====
+def export_theme(
+    theme: Theme, names: Optional[Iterable[str]] = None
+) -> Dict[str, bool]:
+    """Run the enabled exporters for a resolved theme in parallel
+
+    Returns exporter name -> whether its file was written. A failing
+    exporter is reported and doesn't stop the others.
+    """
+    if names is None:
+        names = ENABLED_EXPORTERS if ENABLED_EXPORTERS is not None else EXPORTERS
+    selected = [EXPORTERS[name] for name in names if EXPORTERS[name].installed()]
+    # Fill the palette caches once, before the threads read them
+    from palette import ansi_palette, indexed_palette
+
+    ansi_palette(theme)
+    indexed_palette(theme)
+
+    def run(exporter):
+        try:
+            return exporter.export(theme)
+        except Exception as e:
+            print(f"Error: {exporter.name} export failed: {e}")
+            return False
+
+    if len(selected) < 2:
+        return {exporter.name: run(exporter) for exporter in selected}
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=len(selected)) as pool:
+        results = pool.map(run, selected)
+        return {exporter.name: result for exporter, result in zip(selected, results)}
+
+
+def _stamp_path(name: str) -> str:
+    return os.path.join(EXPORT_STAMP_DIR, f"{name}.stamp")
+
+
+def _read_stamp(name: str) -> Optional[str]:
+    try:
+        with open(_stamp_path(name), "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _write_stamp(name: str, digest: str):
+    try:
+        os.makedirs(EXPORT_STAMP_DIR, exist_ok=True)
+        with open(_stamp_path(name), "w") as f:
+            f.write(digest)
+    except OSError:
+        pass  # Only costs a redundant write next time
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the Qtile theme")
+    parser.add_argument("theme", nargs="?", help="theme name (default: current)")
+    parser.add_argument(
+        "--only", nargs="+", choices=sorted(EXPORTERS), help="exporters to run"
+    )
+    args = parser.parse_args()
+    name = args.theme or Theme.get_current_qtile_theme()
+    export_theme(Theme.get_theme(name), args.only)
+
+
+if __name__ == "__main__":
+    main()
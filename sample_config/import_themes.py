@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# import_themes.py
+"""
+Import a collection of terminal color schemes as Qtile themes.
+
+Walks a local checkout of base16 schemes (*.yaml / *.yml, both the
+classic and the tinted-theming "palette:" layout) or of the
+alacritty-theme repository (*.toml, or the older *.yml), maps every
+scheme onto the eight Theme roles and writes them as one JSON registry
+into themes.d, where themes.py picks them up (see load_theme_dir()).
+
+Files are parsed in a process pool. Schemes with an identical palette
+are only imported once.
+
+    python import_themes.py ~/src/base16-schemes ~/src/alacritty-theme
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from themes import _THEME_DATA, COLOR_FIELDS, THEME_DIR, THEME_FIELDS, _canonical_hex
+
+# Registry written by default, loaded like any other themes.d file
+IMPORT_OUTPUT = os.path.join(THEME_DIR, "imported.json")
+SCHEME_SUFFIXES = (".yaml", ".yml", ".toml")
+
+# Theme role -> base16 slot (00-07 greys, 08 red, 09 orange, 0B green,
+# 0D blue, 0E magenta)
+BASE16_ROLES = {
+    "background": "base00",
+    "foreground": "base05",
+    "primary": "base0D",
+    "secondary": "base0E",
+    "highlight": "base0B",
+    "warning": "base08",
+    "glow": "base01",
+    "pulse": "base09",
+}
+# Theme role -> Alacritty (table, color)
+ALACRITTY_ROLES = {
+    "background": ("primary", "background"),
+    "foreground": ("primary", "foreground"),
+    "primary": ("normal", "blue"),
+    "secondary": ("normal", "magenta"),
+    "highlight": ("normal", "green"),
+    "warning": ("normal", "red"),
+    "glow": ("bright", "black"),
+    "pulse": ("normal", "yellow"),
+}
+
+# Keys a scheme can't take: built-in themes, and field names, which would
+# make themes.d read the registry as a single theme
+_RESERVED_KEYS = set(_THEME_DATA) | set(THEME_FIELDS)
+
+_YAML_LINE = re.compile(r"^(\s*)([\w.-]+)\s*:\s*(.*?)\s*$")
+
+
+def _simple_yaml(text: str) -> Dict:
+    """Parse nested mappings of scalars, all that scheme files use"""
+    root: Dict = {}
+    stack = [(-1, root)]
+    for line in text.splitlines():
+        match = _YAML_LINE.match(line)
+        if not match or line.lstrip().startswith("#"):
+            continue
+        indent, key, value = len(match.group(1)), match.group(2), match.group(3)
+        while stack[-1][0] >= indent:
+            stack.pop()
+        if value[:1] in ("'", '"'):
+            value = value[1 : value.find(value[0], 1)]
+        else:
+            value = value.split(" #")[0].strip()
+        if value:
+            stack[-1][1][key] = value
+        else:
+            stack[-1][1][key] = child = {}
+            stack.append((indent, child))
+    return root
+
+
+def _hex(value) -> str:
+    """Normalise a scheme colour (0xRRGGBB, #rrggbb or rrggbb) to #rrggbb"""
+    value = str(value).strip()
+    if value[:2].lower() == "0x":
+        value = value[2:]
+    return _canonical_hex(value if value.startswith("#") else f"#{value}")
+
+
+def _theme_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def parse_scheme(path: str) -> Tuple[str, List[str]]:
+    """Map one scheme file onto THEME_FIELDS, returns (key, values)
+
+    Raises ValueError if the file isn't a scheme this importer knows.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = _simple_yaml(f.read())
+
+    palette = data.get("palette", data)
+    if isinstance(palette, dict) and "base00" in palette:
+        name = data.get("name") or data.get("scheme") or stem
+        colors = [_hex(palette[BASE16_ROLES[role]]) for role in COLOR_FIELDS]
+    elif isinstance(data.get("colors"), dict):
+        tables = data["colors"]
+        name = stem.replace("_", " ").replace("-", " ").title()
+        colors = [
+            _hex(tables[table][color])
+            for table, color in (ALACRITTY_ROLES[role] for role in COLOR_FIELDS)
+        ]
+    else:
+        raise ValueError("not a base16 or Alacritty color scheme")
+    return _theme_key(stem), [name] + colors
+
+
+def _parse_safely(path: str) -> Tuple[str, Optional[Tuple[str, List[str]]], str]:
+    """Worker: (path, (key, values) or None, error message)"""
+    try:
+        return path, parse_scheme(path), ""
+    except Exception as e:  # One broken file mustn't stop the import
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def find_schemes(directories: List[str]) -> List[str]:
+    """All scheme files below directories, in a stable order"""
+    paths = []
+    for directory in directories:
+        for root, dirs, files in os.walk(os.path.expanduser(directory)):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            paths += [
+                os.path.join(root, name)
+                for name in sorted(files)
+                if name.endswith(SCHEME_SUFFIXES)
+            ]
+    return paths
+
+
+def import_schemes(paths: List[str], workers: Optional[int] = None) -> Dict:
+    """Parse scheme files in a process pool, returns the registry to write
+
+    The first scheme with a given palette wins, later ones with the same
+    eight colours are dropped. Keys that are taken by a different palette,
+    a built-in theme or a theme field name get a numeric suffix.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    registry: Dict[str, List[str]] = {}
+    seen = set()
+    duplicates = failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() keeps the input order, so the result doesn't depend on timing
+        for path, parsed, error in pool.map(_parse_safely, paths, chunksize=chunksize):
+            if parsed is None:
+                failures += 1
+                print(f"Error: skipped {path}: {error}")
+                continue
+            key, values = parsed
+            digest = hashlib.sha1("".join(values[1:]).encode()).hexdigest()
+            if digest in seen:
+                duplicates += 1
+                continue
+            seen.add(digest)
+            unique_key, n = key, 1
+            while unique_key in registry or unique_key in _RESERVED_KEYS:
+                n += 1
+                unique_key = f"{key}_{n}"
+            registry[unique_key] = values
+    print(
+        f"Imported {len(registry)} themes from {len(paths)} files "
+        f"({duplicates} duplicate palettes, {failures} failures)"
+    )
+    return registry
+
+
+def write_registry(registry: Dict, path: str = IMPORT_OUTPUT):
+    """Write the registry atomically, in the list format of load_theme_dir()"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(registry, f, sort_keys=True, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    print(f"Wrote {path}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import color scheme collections")
+    parser.add_argument("directories", nargs="+", help="directories to scan")
+    parser.add_argument(
+        "-o", "--output", default=IMPORT_OUTPUT, help="registry file to write"
+    )
+    parser.add_argument("--prefix", default="", help="prepended to every theme key")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes")
+    args = parser.parse_args()
+
+    registry = import_schemes(find_schemes(args.directories), args.jobs)
+    if args.prefix:
+        registry = {args.prefix + key: values for key, values in registry.items()}
+    write_registry(registry, os.path.expanduser(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 """
 Keybindings for Qtile configuration.
-Depenendcies:
+Depenendcies (volume/brightness fallback, see media_keys.py):
     brightnessctl
     amixer
 """
@@ -9,6 +9,8 @@ from libqtile.config import Key
 from libqtile.lazy import lazy
 import os
 
+from media_keys import BRIGHTNESS, VOLUME
+
 MOD = "mod4"
 TERMINAL = "alacritty"
 
@@ -17,17 +19,17 @@ keys = [
     Key(
         [],
         "XF86AudioLowerVolume",
-        lazy.spawn("amixer sset Master 5%-"),
+        lazy.function(VOLUME.press, -5),
         desc="Lower Volume by 5%",
     ),
     Key(
         [],
         "XF86AudioRaiseVolume",
-        lazy.spawn("amixer sset Master 5%+"),
+        lazy.function(VOLUME.press, 5),
         desc="Raise Volume by 5%",
     ),
-    Key([], "XF86MonBrightnessUp", lazy.spawn("brightnessctl set +5%")),
-    Key([], "XF86MonBrightnessDown", lazy.spawn("brightnessctl set 5%-")),
+    Key([], "XF86MonBrightnessUp", lazy.function(BRIGHTNESS.press, 5)),
+    Key([], "XF86MonBrightnessDown", lazy.function(BRIGHTNESS.press, -5)),
     Key([MOD], "h", lazy.layout.left(), desc="Move focus to left"),
     Key([MOD], "l", lazy.layout.right(), desc="Move focus to right"),
     Key([MOD], "j", lazy.layout.down(), desc="Move focus down"),
@@ -0,0 +1,174 @@
+# media_keys.py
+"""
+Volume and brightness keys handled inside Qtile.
+Optional dependencies (fallback only):
+    brightnessctl
+    amixer
+
+Brightness is written straight to /sys/class/backlight and the volume is
+set through libasound, both kept open between presses, so holding a key
+does not spawn a process per repeat. Presses arriving within one FRAME
+are added up and applied as a single change.
+
+The backlight needs write access to its brightness file (brightnessctl
+installs a udev rule for the video group). When a backend is unavailable
+the key falls back to spawning amixer/brightnessctl as before.
+
+    Key([], "XF86AudioRaiseVolume", lazy.function(VOLUME.press, 5))
+"""
+
+import ctypes
+import ctypes.util
+import glob
+import os
+from typing import Callable, Optional
+
+BACKLIGHT_GLOB = "/sys/class/backlight/*"
+MIXER_CARD = "default"
+MIXER_CONTROL = "Master"
+
+# Seconds during which repeated presses are combined into one change
+FRAME = 1 / 60
+
+
+class Backlight:
+    """The first backlight device, changed via its sysfs brightness file"""
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            devices = sorted(glob.glob(BACKLIGHT_GLOB))
+            if not devices:
+                raise OSError("No backlight device found")
+            path = devices[0]
+        with open(os.path.join(path, "max_brightness")) as f:
+            self.max = int(f.read())
+        self.fd = os.open(os.path.join(path, "brightness"), os.O_RDWR | os.O_CLOEXEC)
+
+    def change(self, percent: int):
+        current = int(os.pread(self.fd, 32, 0))
+        step = round(self.max * percent / 100) or (1 if percent else 0)
+        value = min(max(current + step, 0), self.max)
+        if value != current:
+            os.pwrite(self.fd, str(value).encode(), 0)
+
+
+class AlsaMixer:
+    """A playback volume control, changed through libasound"""
+
+    def __init__(self, card: str = MIXER_CARD, control: str = MIXER_CONTROL):
+        asound = ctypes.CDLL(ctypes.util.find_library("asound") or "libasound.so.2")
+        asound.snd_mixer_find_selem.restype = ctypes.c_void_p
+        asound.snd_mixer_attach.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        asound.snd_mixer_selem_register.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+        ]
+        asound.snd_mixer_load.argtypes = [ctypes.c_void_p]
+        asound.snd_mixer_handle_events.argtypes = [ctypes.c_void_p]
+        asound.snd_mixer_selem_id_set_name.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        asound.snd_mixer_find_selem.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        asound.snd_mixer_selem_get_playback_volume_range.argtypes = [
+            ctypes.c_void_p,
+            ctypes.POINTER(ctypes.c_long),
+            ctypes.POINTER(ctypes.c_long),
+        ]
+        asound.snd_mixer_selem_get_playback_volume.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_int,
+            ctypes.POINTER(ctypes.c_long),
+        ]
+        asound.snd_mixer_selem_set_playback_volume_all.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_long,
+        ]
+
+        handle = ctypes.c_void_p()
+        selem_id = ctypes.c_void_p()
+        if (
+            asound.snd_mixer_open(ctypes.byref(handle), 0) < 0
+            or asound.snd_mixer_attach(handle, card.encode()) < 0
+            or asound.snd_mixer_selem_register(handle, None, None) < 0
+            or asound.snd_mixer_load(handle) < 0
+            or asound.snd_mixer_selem_id_malloc(ctypes.byref(selem_id)) < 0
+        ):
+            raise OSError(f"Cannot open mixer {card}")
+        asound.snd_mixer_selem_id_set_index(selem_id, 0)
+        asound.snd_mixer_selem_id_set_name(selem_id, control.encode())
+        self.elem = asound.snd_mixer_find_selem(handle, selem_id)
+        if not self.elem:
+            raise OSError(f"No mixer control {control} on {card}")
+        low, high = ctypes.c_long(), ctypes.c_long()
+        asound.snd_mixer_selem_get_playback_volume_range(
+            self.elem, ctypes.byref(low), ctypes.byref(high)
+        )
+        self.min, self.max = low.value, high.value
+        self._handle = handle
+        self._asound = asound
+
+    def change(self, percent: int):
+        # Pick up changes made by other programs since the last press
+        self._asound.snd_mixer_handle_events(self._handle)
+        volume = ctypes.c_long()
+        # Channel 0 is SND_MIXER_SCHN_FRONT_LEFT (or MONO)
+        if self._asound.snd_mixer_selem_get_playback_volume(
+            self.elem, 0, ctypes.byref(volume)
+        ):
+            raise OSError(f"Cannot read the {MIXER_CONTROL} volume")
+        step = round((self.max - self.min) * percent / 100) or (1 if percent else 0)
+        value = min(max(volume.value + step, self.min), self.max)
+        if self._asound.snd_mixer_selem_set_playback_volume_all(self.elem, value):
+            raise OSError(f"Cannot set the {MIXER_CONTROL} volume")
+
+
+class Control:
+    """Coalesces presses of one key pair and applies them once per FRAME"""
+
+    def __init__(self, name: str, backend: Callable, fallback: Callable[[int], str]):
+        self.name = name
+        self._open_backend = backend
+        self._backend = None
+        self._fallback = fallback
+        self._pending = 0
+        self._scheduled = False
+
+    def press(self, qtile, percent: int):
+        """Key handler, use with lazy.function(control.press, percent)"""
+        self._pending += percent
+        if not self._scheduled:
+            self._scheduled = True
+            qtile.call_later(FRAME, self._apply, qtile)
+
+    def _apply(self, qtile):
+        percent, self._pending, self._scheduled = self._pending, 0, False
+        if not percent:
+            return
+        if self._backend is None and self._open_backend is not None:
+            try:
+                self._backend = self._open_backend()
+            except OSError as e:
+                print(f"Error: {self.name} backend unavailable, spawning instead: {e}")
+                self._open_backend = None
+        if self._backend is not None:
+            try:
+                self._backend.change(percent)
+                return
+            except OSError as e:
+                print(f"Error: could not change {self.name}: {e}")
+                self._backend = self._open_backend = None
+        qtile.spawn(self._fallback(percent))
+
+
+VOLUME = Control(
+    "volume",
+    AlsaMixer,
+    lambda percent: f"amixer sset {MIXER_CONTROL} {abs(percent)}%"
+    + ("+" if percent > 0 else "-"),
+)
+BRIGHTNESS = Control(
+    "brightness",
+    Backlight,
+    lambda percent: f"brightnessctl set +{percent}%"
+    if percent > 0
+    else f"brightnessctl set {-percent}%-",
+)
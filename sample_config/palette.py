@@ -0,0 +1,183 @@
+# palette.py
+"""
+Derive terminal colour palettes from Qtile themes.
+Dependencies:
+    numpy
+
+All maths happens in the Oklab colour space so lightened/darkened
+variants keep their perceived hue. Palettes for any number of themes are
+computed in a single batch and cached per Theme: the 16 ANSI colours and
+the 240 colour extended range (6x6x6 cube and grey ramp, indices 16-255).
+"""
+
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+from themes import Theme
+
+ANSI_NAMES = ("black", "red", "green", "yellow", "blue", "magenta", "cyan", "white")
+
+# Oklab L shift applied to the normal colours to get the bright ones
+BRIGHT_SHIFT = 0.08
+# How far (in Oklab L) black sits from the background, normal and bright
+BLACK_SHIFT = (0.08, 0.30)
+
+# Caches keyed by Theme, whose hash covers its name and colours:
+# Theme -> 16 hex colours (normal 0-7, then bright 8-15)
+_palette_cache: Dict[Theme, Tuple[str, ...]] = {}
+# Theme -> 240 hex colours for indices 16-255
+_indexed_cache: Dict[Theme, Tuple[str, ...]] = {}
+
+# Linear sRGB -> LMS and LMS' -> Oklab (Björn Ottosson)
+_RGB_TO_LMS = np.array(
+    [
+        [0.4122214708, 0.5363325363, 0.0514459929],
+        [0.2119034982, 0.6806995451, 0.1073969566],
+        [0.0883024619, 0.2817188376, 0.6299787005],
+    ]
+)
+_LMS_TO_LAB = np.array(
+    [
+        [0.2104542553, 0.7936177850, -0.0040720468],
+        [1.9779984951, -2.4285922050, 0.4505937099],
+        [0.0259040371, 0.7827717662, -0.8086757660],
+    ]
+)
+_LAB_TO_LMS = np.linalg.inv(_LMS_TO_LAB)
+_LMS_TO_RGB = np.linalg.inv(_RGB_TO_LMS)
+
+
+def _indexed_weights() -> np.ndarray:
+    """Blend weights (240, 8) of the normal ANSI colours for indices 16-255
+
+    The 6x6x6 cube is a trilinear blend between the eight normal colours,
+    which sit on its corners (black at 0,0,0, white at 5,5,5, red/green/blue
+    along the axes). The 24 step grey ramp blends black into white.
+    """
+    steps = np.arange(6) / 5
+    grid = np.meshgrid(steps, steps, steps, indexing="ij")
+    r, g, b = (axis.ravel() for axis in grid)
+    weights = np.ones((216, 8))
+    for corner in range(8):
+        for bit, t in enumerate((r, g, b)):
+            weights[:, corner] *= t if corner >> bit & 1 else 1 - t
+    grey = np.zeros((24, 8))
+    grey[:, 7] = np.arange(1, 25) / 25
+    grey[:, 0] = 1 - grey[:, 7]
+    return np.concatenate([weights, grey])
+
+
+_INDEXED_WEIGHTS = _indexed_weights()
+
+
+# ===== Colour Space Conversion =====
+def unpack(packed: np.ndarray) -> np.ndarray:
+    """Packed 0xRRGGBB integers (...) -> sRGB floats in [0, 1] (..., 3)"""
+    packed = np.asarray(packed, dtype=np.uint32)
+    channels = np.stack([packed >> 16, packed >> 8, packed], axis=-1) & 0xFF
+    return channels / 255.0
+
+
+def pack(rgb: np.ndarray) -> np.ndarray:
+    """sRGB floats in [0, 1] (..., 3) -> packed 0xRRGGBB integers (...)"""
+    channels = np.rint(np.clip(rgb, 0.0, 1.0) * 255.0).astype(np.uint32)
+    return (channels[..., 0] << 16) | (channels[..., 1] << 8) | channels[..., 2]
+
+
+def srgb_to_oklab(rgb: np.ndarray) -> np.ndarray:
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    return np.cbrt(linear @ _RGB_TO_LMS.T) @ _LMS_TO_LAB.T
+
+
+def oklab_to_srgb(lab: np.ndarray) -> np.ndarray:
+    linear = np.clip((lab @ _LAB_TO_LMS.T) ** 3 @ _LMS_TO_RGB.T, 0.0, 1.0)
+    return np.where(
+        linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055
+    )
+
+
+def to_hex(packed: np.ndarray) -> Tuple[str, ...]:
+    return tuple(f"#{int(value):06x}" for value in np.ravel(packed))
+
+
+# ===== ANSI Palette =====
+def _derive_ansi(lab: np.ndarray) -> np.ndarray:
+    """Theme colours in Oklab (N, 8, 3), COLOR_FIELDS order -> ANSI (N, 16, 3)"""
+    (background, foreground, primary, secondary, highlight, warning, _, pulse) = (
+        lab[:, i] for i in range(8)
+    )
+    # Move lightness away from the background, towards the foreground
+    direction = np.sign(foreground[:, :1] - background[:, :1])
+    direction[direction == 0] = 1
+
+    def shift(color, amount):
+        shifted = color.copy()
+        shifted[:, 0] = np.clip(color[:, 0] + direction[:, 0] * amount, 0.0, 1.0)
+        return shifted
+
+    cyan = (primary + highlight) / 2  # Blue + green, mixed perceptually
+    normal = np.stack(
+        [
+            shift(background, BLACK_SHIFT[0]),
+            warning,
+            highlight,
+            pulse,
+            primary,
+            secondary,
+            cyan,
+            foreground,
+        ],
+        axis=1,
+    )
+    bright = normal.copy()
+    bright[:, 1:7, 0] = np.clip(normal[:, 1:7, 0] + BRIGHT_SHIFT, 0.0, 1.0)
+    bright[:, 1:7, 1:] *= 1.1  # Slightly more saturated
+    bright[:, 0] = shift(background, BLACK_SHIFT[1])
+    bright[:, 7] = shift(foreground, BRIGHT_SHIFT)
+    return np.concatenate([normal, bright], axis=1)
+
+
+def _ansi_lab(themes) -> np.ndarray:
+    """Oklab ANSI colours (N, 16, 3) for a list of themes"""
+    return _derive_ansi(srgb_to_oklab(unpack([theme.packed for theme in themes])))
+
+
+def ansi_palettes(themes: Iterable[Theme]) -> Dict[Theme, Tuple[str, ...]]:
+    """Get the 16 colour ANSI palette of every theme, computed as one batch"""
+    themes = list(dict.fromkeys(themes))
+    missing = [theme for theme in themes if theme not in _palette_cache]
+    if missing:
+        packed = pack(oklab_to_srgb(_ansi_lab(missing)))
+        for theme, row in zip(missing, packed):
+            _palette_cache[theme] = to_hex(row)
+    return {theme: _palette_cache[theme] for theme in themes}
+
+
+def ansi_palette(theme: Theme) -> Tuple[str, ...]:
+    """Get a theme's ANSI palette: normal colours 0-7, then bright 8-15"""
+    palette = _palette_cache.get(theme)
+    if palette is None:
+        palette = ansi_palettes([theme])[theme]
+    return palette
+
+
+# ===== 256 Colour Palette =====
+def indexed_palettes(themes: Iterable[Theme]) -> Dict[Theme, Tuple[str, ...]]:
+    """Get colours 16-255 (cube + grey ramp) of every theme, as one batch"""
+    themes = list(dict.fromkeys(themes))
+    missing = [theme for theme in themes if theme not in _indexed_cache]
+    if missing:
+        normal = _ansi_lab(missing)[:, :8]
+        packed = pack(oklab_to_srgb(_INDEXED_WEIGHTS @ normal))
+        for theme, row in zip(missing, packed):
+            _indexed_cache[theme] = to_hex(row)
+    return {theme: _indexed_cache[theme] for theme in themes}
+
+
+def indexed_palette(theme: Theme) -> Tuple[str, ...]:
+    """Get a theme's colours for indices 16-255, tinted by its palette"""
+    palette = _indexed_cache.get(theme)
+    if palette is None:
+        palette = indexed_palettes([theme])[theme]
+    return palette
@@ -1,12 +1,14 @@
-from libqtile import widget
-from qtile_extras import widget as extra_widget
-from qtile_extras.widget.decorations import PowerLineDecoration, RectDecoration
+import weakref
 
-from themes import Theme
+from themes import Theme, on_theme_change
+
+# libqtile.widget and qtile_extras are imported inside the functions that
+# build the bar, so importing this module (or themes) stays cheap
 
 theme = Theme.get_theme(Theme.get_current_qtile_theme())
 
-# Theme colors
+# Theme colors at import time; the bar builders read theme.<field>, since
+# apply_theme() rebinds theme when the theme is switched at runtime
 BACKGROUND = theme.background
 FOREGROUND = theme.foreground
 PRIMARY = theme.primary
@@ -16,104 +18,233 @@ ACCENT = theme.warning  # Using warning color as accent
 GLOW = theme.glow
 PULSE = theme.pulse
 
+# ===== Runtime Theme Switching =====
+# Widget -> {attribute: theme field or (theme field, alpha)}
+_themed_widgets = weakref.WeakKeyDictionary()
+
+
+def _colour(new_theme: Theme, role):
+    if isinstance(role, tuple):
+        return new_theme.rgba(*role)
+    return getattr(new_theme, role)
+
+
+def themed(obj, **roles):
+    """Record which theme colour each attribute of a widget uses"""
+    _themed_widgets[obj] = roles
+    return obj
+
+
+def themed_decoration(decoration, **roles):
+    """Record which theme colour each attribute of a decoration uses
+
+    The roles are kept on the decoration itself, since qtile_extras clones
+    decorations for every widget they are attached to.
+    """
+    decoration._qtile_theme_roles = roles
+    return decoration
+
+
+@on_theme_change
+def apply_theme(new_theme: Theme):
+    """Recolour the bar widgets in place and redraw them"""
+    global theme
+    theme = new_theme
+    for obj, roles in list(_themed_widgets.items()):
+        for attr, role in roles.items():
+            setattr(obj, attr, _colour(new_theme, role))
+        for decoration in getattr(obj, "decorations", ()):
+            for attr, role in getattr(decoration, "_qtile_theme_roles", {}).items():
+                setattr(decoration, attr, _colour(new_theme, role))
+        if getattr(obj, "configured", False):
+            obj.draw()
+
+
 # ===== Modern Decorations =====
-modern_decoration = {
-    "decorations": [
-        RectDecoration(
-            colour=GLOW, radius=8, filled=True, padding_x=6, padding_y=2, extrawidth=4
-        )
-    ]
-}
+def modern_decoration():
+    from qtile_extras.widget.decorations import RectDecoration
 
-minimal_decoration = {
-    "decorations": [
-        RectDecoration(
-            colour=f"{GLOW}40", radius=6, filled=True, padding_x=4, padding_y=0
-        )
-    ]
-}
+    return {
+        "decorations": [
+            themed_decoration(
+                RectDecoration(
+                    colour=theme.glow,
+                    radius=8,
+                    filled=True,
+                    padding_x=6,
+                    padding_y=2,
+                    extrawidth=4,
+                ),
+                colour="glow",
+            )
+        ]
+    }
 
-divider_decoration = {
-    "decorations": [
-        PowerLineDecoration(path="forward_slash", color=f"{FOREGROUND}20", size=12)
-    ]
-}
+
+def minimal_decoration():
+    from qtile_extras.widget.decorations import RectDecoration
+
+    return {
+        "decorations": [
+            themed_decoration(
+                RectDecoration(
+                    colour=theme.rgba("glow", 0x40),
+                    radius=6,
+                    filled=True,
+                    padding_x=4,
+                    padding_y=0,
+                ),
+                colour=("glow", 0x40),
+            )
+        ]
+    }
+
+
+def divider_decoration():
+    from qtile_extras.widget.decorations import PowerLineDecoration
+
+    return {
+        "decorations": [
+            themed_decoration(
+                PowerLineDecoration(
+                    path="forward_slash",
+                    color=theme.rgba("foreground", 0x20),
+                    size=12,
+                ),
+                color=("foreground", 0x20),
+            )
+        ]
+    }
 
 
 # ===== Modern Widgets =====
 def left_widgets():
     """Widgets for left-aligned bar"""
+    from libqtile import widget
+
     return [
         # ---- Logo ----
-        widget.TextBox(
-            text="",  # Arch Linux logo
-            foreground=PRIMARY,
-            fontsize=20,
-            padding=12,
-            **modern_decoration,
+        themed(
+            widget.TextBox(
+                text="",  # Arch Linux logo
+                foreground=theme.primary,
+                fontsize=20,
+                padding=12,
+                **modern_decoration(),
+            ),
+            foreground="primary",
         ),
         # ---- Group Box ----
-        widget.GroupBox(
-            foreground=FOREGROUND,
-            active=PRIMARY,
-            inactive="#3a3a5a",
-            block_highlight_text_color=FOREGROUND,
-            highlight_method="block",
-            this_current_screen_border=HIGHLIGHT,
-            borderwidth=0,
-            padding_x=8,
-            spacing=8,
-            urgent_alert_method="block",
-            urgent_text=ACCENT,
-            **divider_decoration,
+        themed(
+            widget.GroupBox(
+                foreground=theme.foreground,
+                active=theme.primary,
+                inactive="#3a3a5a",
+                block_highlight_text_color=theme.foreground,
+                highlight_method="block",
+                this_current_screen_border=theme.highlight,
+                borderwidth=0,
+                padding_x=8,
+                spacing=8,
+                urgent_alert_method="block",
+                urgent_text=theme.warning,
+                **divider_decoration(),
+            ),
+            foreground="foreground",
+            active="primary",
+            block_highlight_text_color="foreground",
+            this_current_screen_border="highlight",
+            urgent_text="warning",
         ),
         widget.Spacer(length=8),
         # ---- Prompt -----
-        widget.Prompt(prompt=">",
-                      cursor_color=FOREGROUND)
+        themed(
+            widget.Prompt(prompt=">", cursor_color=theme.foreground),
+            cursor_color="foreground",
+        ),
     ]
 
 
 def right_widgets():
     """Widgets for right-aligned bar"""
+    from libqtile import widget
+
+    # CPU, temperature and memory share one sampler (see system_sampler.py),
+    # which also slows the clocks down while the session is idle
+    from system_sampler import SampledCPU, SampledMemory, SampledThermal, adaptive
+
     return [
         # ---- System Tray ----
-        widget.Systray(icon_size=18, padding=8, background=f"{GLOW}30"),
+        themed(
+            widget.Systray(
+                icon_size=18, padding=8, background=theme.rgba("glow", 0x30)
+            ),
+            background=("glow", 0x30),
+        ),
         # ---- CPU ----
-        widget.CPU(
-            foreground=PRIMARY,
-            format=" {load_percent}%",
-            padding=8,
-            **minimal_decoration,
+        themed(
+            SampledCPU(
+                foreground=theme.primary,
+                format=" {load_percent}%",
+                padding=8,
+                **minimal_decoration(),
+            ),
+            foreground="primary",
         ),
         # ---- Temperature ----
-        widget.ThermalSensor(
-            foreground=FOREGROUND,  # Normal text color
-            foreground_alert=" #e73a15",  # Color when threshold is exceeded
-            tag="coretemp",  # Try 'k10temp' for AMD or 'cpu_thermal' for Pi
-            threshold=80,
-            fmt="🌡️ {}",
-            padding=5,
-            update_interval=5,
+        themed(
+            SampledThermal(
+                foreground=theme.foreground,  # Normal text color
+                foreground_alert=theme.warning,  # Color when threshold is exceeded
+                tag="coretemp",  # Try 'k10temp' for AMD or 'cpu_thermal' for Pi
+                threshold=80,
+                fmt="🌡️ {}",
+                padding=5,
+                update_interval=5,
+            ),
+            foreground_normal="foreground",
+            foreground_alert="warning",
         ),
         # ---- Memory ----
-        widget.Memory(
-            foreground=SECONDARY,
-            format=" {MemUsed:.1f}G",
-            measure_mem="G",
-            padding=8,
-            **minimal_decoration,
+        themed(
+            SampledMemory(
+                foreground=theme.secondary,
+                format=" {MemUsed:.1f}G",
+                measure_mem="G",
+                padding=8,
+                **minimal_decoration(),
+            ),
+            foreground="secondary",
         ),
         # ---- Clock ----
-        widget.Clock(
-            foreground=HIGHLIGHT, format=" %H:%M", padding=10, **minimal_decoration
+        themed(
+            adaptive(
+                widget.Clock(
+                    foreground=theme.highlight,
+                    format=" %H:%M",
+                    padding=10,
+                    **minimal_decoration(),
+                )
+            ),
+            foreground="highlight",
         ),
         # ---- Date ----
-        widget.Clock(
-            foreground=FOREGROUND, format=" %a %d", padding=10, **minimal_decoration
+        themed(
+            adaptive(
+                widget.Clock(
+                    foreground=theme.foreground,
+                    format=" %a %d",
+                    padding=10,
+                    **minimal_decoration(),
+                )
+            ),
+            foreground="foreground",
         ),
         # ---- Layout Icon ----
-        widget.CurrentLayoutIcon(
-            scale=0.7, foreground=SECONDARY, padding=8, **minimal_decoration
+        themed(
+            widget.CurrentLayoutIcon(
+                scale=0.7, foreground=theme.secondary, padding=8, **minimal_decoration()
+            ),
+            foreground="secondary",
         ),
     ]
@@ -0,0 +1,124 @@
+# startup_trace.py
+"""
+Opt-in timing of Qtile config loading and startup hooks.
+
+Set QTILE_TRACE=1 in Qtile's environment to record wall and CPU time of
+each phase. Every config load writes a Chrome trace file (open it in
+chrome://tracing or https://ui.perfetto.dev) to TRACE_DIR.
+
+    python startup_trace.py        # compare the most recent traces
+"""
+
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+ENABLED = os.environ.get("QTILE_TRACE", "") not in ("", "0")
+TRACE_DIR = os.path.expanduser("~/.cache/qtile/traces")
+
+_events: List[Dict] = []
+_depth = 0
+_trace_path = None
+
+
+def start():
+    """Begin a new trace, call this at the top of config.py"""
+    global _trace_path
+    if not ENABLED:
+        return
+    _events.clear()
+    _trace_path = os.path.join(
+        TRACE_DIR, time.strftime("trace-%Y%m%d-%H%M%S") + f"-{os.getpid()}.json"
+    )
+
+
+@contextmanager
+def phase(name: str):
+    """Time the enclosed block as one phase of the trace"""
+    global _depth
+    if not ENABLED:
+        yield
+        return
+    _depth += 1
+    wall = time.perf_counter_ns()
+    cpu = time.process_time_ns()
+    try:
+        yield
+    finally:
+        cpu = time.process_time_ns() - cpu
+        wall_end = time.perf_counter_ns()
+        _depth -= 1
+        _events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": wall / 1000,
+                "dur": (wall_end - wall) / 1000,
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": {"cpu_us": cpu / 1000},
+            }
+        )
+        if _depth == 0:
+            write_trace()
+
+
+def traced(func):
+    """Decorator timing every call of func as a phase"""
+    if not ENABLED:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with phase(func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def write_trace():
+    """Write the events recorded so far to this config load's trace file"""
+    if _trace_path is None:
+        return
+    try:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        with open(_trace_path, "w") as f:
+            json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f)
+    except OSError as e:
+        print(f"Error: could not write startup trace: {e}")
+
+
+def main(count: int = 10):
+    """Print per-phase wall time (ms) of the most recent traces"""
+    try:
+        names = sorted(n for n in os.listdir(TRACE_DIR) if n.endswith(".json"))
+    except FileNotFoundError:
+        names = []
+    if not names:
+        print(f"No traces in {TRACE_DIR}, start Qtile with QTILE_TRACE=1")
+        return
+
+    runs = []
+    for name in names[-count:]:
+        with open(os.path.join(TRACE_DIR, name)) as f:
+            events = json.load(f)["traceEvents"]
+        durations: Dict[str, float] = {}
+        for event in events:
+            durations[event["name"]] = durations.get(event["name"], 0) + event["dur"]
+        runs.append((name, durations))
+
+    phases = list(dict.fromkeys(p for _, durations in runs for p in durations))
+    print(f"{'trace':34}" + "".join(f"{p[:16]:>17}" for p in phases))
+    for name, durations in runs:
+        cells = "".join(
+            f"{durations[p] / 1000:17.1f}" if p in durations else f"{'-':>17}"
+            for p in phases
+        )
+        print(f"{name[:-5]:34}{cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,150 @@
 #!/usr/bin/env python3
+import fcntl
+import glob
+import hashlib
+import importlib
+import json
 import os
 import re
+import select
+import struct
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple
 
-import toml
-
+import themes
 from themes import Theme
 
+# palette (and with it numpy) is only imported once colors are built
+
 # Path to your Alacritty config file
 ALACRITTY_CONFIG = os.path.expanduser("~/.config/alacritty/alacritty.toml")
 QTILE_CONFIG = os.path.expanduser("~/.config/qtile/config.py")
+# Digest of the colors and config bytes from the last successful sync
+SYNC_STAMP = os.path.expanduser("~/.cache/qtile/alacritty_sync.stamp")
+# Advisory lock serialising concurrent syncs
+SYNC_LOCK = os.path.expanduser("~/.cache/qtile/alacritty_sync.lock")
+
+# "splice": rewrite the generated colors inside ALACRITTY_CONFIG
+# "link": switch a symlink to a generated colors file; ALACRITTY_CONFIG
+#         must import COLORS_LINK (see README)
+SYNC_MODE = "splice"
+# One generated colors file per theme
+THEME_CACHE_DIR = os.path.expanduser("~/.cache/qtile/alacritty-themes")
+# Symlink imported by ALACRITTY_CONFIG in "link" mode
+COLORS_LINK = os.path.expanduser("~/.config/alacritty/qtile-colors.toml")
+
+# Daemon mode: seconds without further changes before re-syncing
+DEBOUNCE = 0.1
+
+# Also push changed colors to running windows, instead of waiting for each
+# one to re-read the config file
+LIVE_APPLY = False
+# Alacritty's IPC sockets, one per process ($XDG_RUNTIME_DIR/Alacritty-*.sock)
+IPC_SOCKET_GLOB = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "Alacritty-*.sock"
+)
+# Processes scanned for Alacritty's terminals, which are sent OSC color
+# sequences when no IPC socket answers
+PROC_STAT_GLOB = "/proc/[0-9]*/stat"
+ALACRITTY_COMM = "alacritty"
+IPC_TIMEOUT = 1.0
 
 
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sync Alacritty with Qtile theme")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and re-sync whenever the theme changes",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="push the colors to running Alacritty windows, even if unchanged",
+    )
+    args = parser.parse_args()
+
+    if args.daemon:
+        run_daemon()
+        return
+
     # Get current Qtile theme (default to 'gruvbox' as in your config)
     current_theme = Theme.get_current_qtile_theme()
     # Update Alacritty config
-    update_alacritty_theme(current_theme)
+    changed = update_alacritty_theme(current_theme)
+    # sync() already pushed the colors if they changed and LIVE_APPLY is set
+    if args.live and not (LIVE_APPLY and changed):
+        live_apply(build_alacritty_colors(Theme.get_theme(current_theme)))
 
 
-def update_alacritty_theme(theme_name: str):
+def update_alacritty_theme(theme_name: str) -> bool:
     """Update Alacritty config with colors from the specified theme"""
-    theme = Theme.get_theme(theme_name)
+    return sync(Theme.get_theme(theme_name))
+
+
+def sync(theme: Theme) -> bool:
+    """Write an already resolved theme's colors to the Alacritty config.
+
+    This is the in-process entry point used by the Qtile config, so a
+    reload doesn't have to launch a new interpreter just to sync colors.
+    Only the colors it generates are replaced (see splice_colors()), the
+    rest of the file is kept byte for byte. The file is left untouched if
+    neither the colors nor the config changed since the last sync.
+    Returns True if written.
+
+    With SYNC_MODE = "link" this repoints COLORS_LINK instead, see
+    link_theme(). With LIVE_APPLY the new colors are also pushed to the
+    running Alacritty windows, see live_apply().
+    """
+    changed = link_theme(theme) if SYNC_MODE == "link" else _splice_theme(theme)
+    if changed and LIVE_APPLY:
+        live_apply(build_alacritty_colors(theme))
+    return changed
+
+
+def _splice_theme(theme: Theme) -> bool:
+    """Rewrite the generated colors of ALACRITTY_CONFIG, True if written"""
+    alacritty_colors = build_alacritty_colors(theme)
+
+    if _is_synced(alacritty_colors):
+        print(f"Alacritty config already up to date with {theme.name} theme")
+        return False
+
+    with _sync_lock():
+        # Another sync may have written the same colors while we waited
+        current = _read_config_bytes()
+        if _read_sync_stamp() == _sync_digest(alacritty_colors, current):
+            print(f"Alacritty config already up to date with {theme.name} theme")
+            return False
+
+        # Replace only the colors tables, keeping every other byte as is
+        updated = splice_colors(current, alacritty_colors)
+        if not _valid_toml(updated) and _valid_toml(current):
+            print(f"Error: splicing the colors would break {ALACRITTY_CONFIG}")
+            return False
+        if updated == current:
+            # Only the rest of the file changed: don't touch it (no new
+            # inode, no live reload), just remember it is in sync
+            _write_sync_stamp(_sync_digest(alacritty_colors, current))
+            print(f"Alacritty config already up to date with {theme.name} theme")
+            return False
+
+        # Write back to config file
+        _atomic_write(ALACRITTY_CONFIG, updated)
+        _write_sync_stamp(_sync_digest(alacritty_colors, updated))
+
+    print(f"Updated Alacritty config with {theme.name} theme")
+    return True
+
+
+def build_alacritty_colors(theme: Theme) -> dict:
+    """Build the Alacritty [colors] table for a theme"""
+    from palette import ANSI_NAMES, ansi_palette, indexed_palette
+
+    palette = ansi_palette(theme)
 
     # Alacritty color mapping for TOML format
     alacritty_colors = {
@@ -33,62 +157,656 @@ def update_alacritty_theme(theme_name: str):
                 "text": theme.background,
                 "cursor": theme.primary,
             },
-            "normal": {
-                "black": "#1e222a",  # Dark background variant
-                "red": theme.warning,
-                "green": theme.highlight,
-                "yellow": theme.pulse,
-                "blue": theme.primary,
-                "magenta": theme.secondary,
-                "cyan": "#56b6c2",  # Complementary color
-                "white": theme.foreground,
-            },
-            "bright": {
-                "black": "#3e4452",  # Lighter background variant
-                "red": "#ff6b6b",  # Brighter warning
-                "green": "#98c379",  # Brighter highlight
-                "yellow": "#e5c07b",  # Brighter pulse
-                "blue": "#61afef",  # Brighter primary
-                "magenta": "#c678dd",  # Brighter secondary
-
-                "cyan": "#56b6c2",  # Brighter complementary
-                "white": "#abb2bf",  # Brighter foreground
-            },
+            "normal": dict(zip(ANSI_NAMES, palette[:8])),
+            "bright": dict(zip(ANSI_NAMES, palette[8:])),
             "indexed_colors": [
-                {"index": 16, "color": theme.pulse},  # Example mapping
-                {"index": 17, "color": theme.warning},
-                {"index": 18, "color": "#303030"},
-                {"index": 19, "color": "#353535"},
-                {"index": 20, "color": "#b2ccd6"},
-                {"index": 21, "color": "#eeffff"},
+                {"index": index, "color": color}
+                for index, color in enumerate(indexed_palette(theme), start=16)
             ],
         }
     }
 
-    # Read existing Alacritty config
+    return alacritty_colors
+
+
+# ===== Daemon =====
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def _inotify_watch(directories) -> Tuple[int, Dict[int, str]]:
+    """Watch directories for written/replaced files, returns (fd, wd -> dir)"""
+    import ctypes
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    fd = libc.inotify_init1(os.O_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    watches = {}
+    for directory in directories:
+        # Editors often save by renaming a new file over the old one,
+        # so watch the directory rather than the file itself
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+        watches[wd] = directory
+    return fd, watches
+
+
+def _read_events(fd: int, watches: Dict[int, str]) -> Set[str]:
+    """Read pending inotify events, returns the paths they refer to"""
+    buf = os.read(fd, 64 * 1024)
+    paths = set()
+    offset = 0
+    while offset < len(buf):
+        wd, _, _, length = _INOTIFY_EVENT.unpack_from(buf, offset)
+        offset += _INOTIFY_EVENT.size
+        name = buf[offset : offset + length].rstrip(b"\0")
+        offset += length
+        if wd in watches and name:
+            paths.add(os.path.join(watches[wd], os.fsdecode(name)))
+    return paths
+
+
+def _watched_events(fd: int, watches: Dict[int, str], watched: Set[str]) -> Set[str]:
+    """Pending events for watched files, or theme files in watched directories"""
+    return {
+        path
+        for path in _read_events(fd, watches)
+        if path in watched
+        or os.path.dirname(path) in watched
+        and path.endswith(themes.THEME_SUFFIXES)
+    }
+
+
+def _wait_for_changes(fd: int, watches: Dict[int, str], watched: Set[str]) -> Set[str]:
+    """Block until a watched file changes, then wait for the burst to settle"""
+    changed = set()
+    while not changed:
+        select.select([fd], [], [])
+        changed = _watched_events(fd, watches, watched)
+    while select.select([fd], [], [], DEBOUNCE)[0]:
+        changed |= _watched_events(fd, watches, watched)
+    return changed
+
+
+def _sync_current_theme():
+    from exporters import export_theme
+
+    try:
+        export_theme(Theme.get_theme(Theme.get_current_qtile_theme()))
+    except Exception as e:  # Keep the daemon alive, e.g. on a half-saved file
+        print(f"Error: Alacritty sync failed: {e}")
+
+
+def run_daemon():
+    """Re-export whenever the theme state, config.py or any theme changes
+
+    Modules, the theme registry and palette caches stay loaded between
+    changes, so each re-sync only costs the sync itself.
+    """
+    global Theme
+    themes_file = os.path.realpath(themes.__file__)
+    theme_dir = os.path.realpath(themes.THEME_DIR)
+    watched = {
+        os.path.realpath(themes.THEME_STATE),
+        os.path.realpath(themes.QTILE_CONFIG),
+        themes_file,
+    }
+    directories = {os.path.dirname(path) for path in watched}
+    if os.path.isdir(theme_dir):
+        watched.add(theme_dir)
+        directories.add(theme_dir)
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+    fd, watches = _inotify_watch(directories)
+
+    _sync_current_theme()
+    while True:
+        changed = _wait_for_changes(fd, watches, watched)
+        if themes_file in changed or any(
+            os.path.dirname(path) == theme_dir for path in changed
+        ):
+            try:
+                importlib.reload(themes)
+            except Exception as e:
+                print(f"Error: could not reload {themes_file}: {e}")
+                continue
+            Theme = themes.Theme
+        _sync_current_theme()
+
+
+# ===== Generated Theme Files =====
+def _theme_file(theme: Theme) -> str:
+    """Path of a theme's generated colors file, named after its contents"""
+    key = repr((theme.name, theme.packed, _sources_key()))
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(THEME_CACHE_DIR, f"{digest[:16]}.toml")
+
+
+def _sources_key() -> str:
+    """Identify the revision of the code the colors files are rendered by"""
+    from importlib.util import find_spec
+
+    keys = []
+    # Locate palette.py without importing it (and numpy with it)
+    for path in (__file__, find_spec("palette").origin):
+        st = os.stat(path)
+        keys.append(f"{st.st_ino}:{st.st_mtime_ns}:{st.st_size}")
+    return " ".join(keys)
+
+
+def _prune_theme_files(keep: str):
+    """Remove generated colors files except keep and the linked one"""
+    linked = os.path.basename(os.path.realpath(COLORS_LINK))
     try:
-        with open(ALACRITTY_CONFIG, "r") as f:
-            config = toml.load(f)
+        names = os.listdir(THEME_CACHE_DIR)
     except FileNotFoundError:
-        config = {}
-
-    # Preserve non-color sections
-    preserved_sections = {
-        "env": config.get("env", {}),
-        "font": config.get("font", {}),
-        "keyboard": config.get("keyboard", {}),
-        "window": config.get("window", {}),
-        "general": config.get("general", {}),
+        return
+    for name in names:
+        if name.endswith(".toml") and name not in (keep, linked):
+            try:
+                os.unlink(os.path.join(THEME_CACHE_DIR, name))
+            except FileNotFoundError:
+                pass
+
+
+def link_theme(theme: Theme) -> bool:
+    """Point COLORS_LINK at the theme's generated colors file
+
+    Switching is a single atomic rename. A theme's file is only rendered
+    the first time it is linked (again after palette.py or this module
+    changed, when the files of the old revision are removed). Returns
+    True if the link changed.
+    """
+    target = _theme_file(theme)
+    with _sync_lock():
+        if not os.path.exists(target):
+            stamp_path = os.path.join(THEME_CACHE_DIR, ".stamp")
+            key = _sources_key()
+            try:
+                with open(stamp_path, "r") as f:
+                    stale = f.read() != key
+            except OSError:
+                stale = True
+            if stale:
+                _prune_theme_files(os.path.basename(target))
+            # A cache file, so no fsync: it is simply rendered again if lost
+            data = render_colors(build_alacritty_colors(theme))
+            _atomic_write(target, data, durable=False)
+            if stale:
+                with open(stamp_path, "w") as f:
+                    f.write(key)
+
+        try:
+            if os.readlink(COLORS_LINK) == target:
+                print(f"Alacritty colors already linked to {theme.name} theme")
+                return False
+        except OSError:
+            pass
+
+        _check_link_config()
+        os.makedirs(os.path.dirname(COLORS_LINK), exist_ok=True)
+        tmp_link = f"{COLORS_LINK}.{os.getpid()}.tmp"
+        os.symlink(target, tmp_link)
+        os.replace(tmp_link, COLORS_LINK)
+
+    print(f"Linked Alacritty colors to {theme.name} theme")
+    return True
+
+
+def _check_link_config():
+    """Make sure ALACRITTY_CONFIG doesn't shadow the imported colors"""
+    current = _read_config_bytes()
+    # Colors set in the main file win over imports, so move them out once
+    tables, keys, _ = _colors_spans(current)
+    if tables or keys:
+        updated = splice_colors(current, None)
+        if not _valid_toml(updated) and _valid_toml(current):
+            print(f"Error: removing the colors would break {ALACRITTY_CONFIG}")
+        else:
+            _atomic_write(ALACRITTY_CONFIG, updated)
+            print(f"Removed the generated colors from {ALACRITTY_CONFIG}")
+    link_name = os.path.basename(COLORS_LINK).encode()
+    if link_name not in current:
+        print(f'Warning: add "{COLORS_LINK}" to the import list in {ALACRITTY_CONFIG}')
+
+
+# ===== Live Apply =====
+def colors_options(alacritty_colors: dict) -> List[str]:
+    """Flatten the colors table into "colors.x.y=value" config overrides"""
+    options = []
+    for key, values in alacritty_colors["colors"].items():
+        if isinstance(values, dict):
+            options += [
+                f"colors.{key}.{k}={_toml_value(v)}" for k, v in values.items()
+            ]
+        else:
+            entries = ", ".join(_inline_table(entry) for entry in values)
+            options.append(f"colors.{key}=[{entries}]")
+    return options
+
+
+def send_config(socket_path: str, options: List[str]) -> bool:
+    """Send options to one Alacritty process, like `alacritty msg config`
+
+    The override applies to all windows of that process. Returns False if
+    nothing is listening (a stale socket) or the options were rejected.
+    """
+    import socket
+
+    message = {"Config": {"options": options, "window_id": None, "reset": False}}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(IPC_TIMEOUT)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(message).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            reply = sock.recv(4096)  # Alacritty only answers with errors
+    except OSError:
+        return False
+    if reply:
+        print(f"Error: {socket_path}: {reply.decode(errors='replace').strip()}")
+        return False
+    return True
+
+
+def osc_sequences(alacritty_colors: dict) -> bytes:
+    """OSC 4/10/11/12 sequences setting the palette, fg, bg and cursor"""
+    from palette import ANSI_NAMES
+
+    colors = alacritty_colors["colors"]
+    palette = [colors["normal"][name] for name in ANSI_NAMES]
+    palette += [colors["bright"][name] for name in ANSI_NAMES]
+    palette += [entry["color"] for entry in colors["indexed_colors"]]
+    parts = [f"\033]4;{i};{color}\007" for i, color in enumerate(palette)]
+    parts.append(f"\033]10;{colors['primary']['foreground']}\007")
+    parts.append(f"\033]11;{colors['primary']['background']}\007")
+    parts.append(f"\033]12;{colors['cursor']['cursor']}\007")
+    return "".join(parts).encode()
+
+
+def write_pty(pty_path: str, data: bytes) -> bool:
+    """Write data to one of our own terminals without ever blocking"""
+    try:
+        fd = os.open(pty_path, os.O_WRONLY | os.O_NOCTTY | os.O_NONBLOCK)
+    except OSError:
+        return False
+    try:
+        if os.fstat(fd).st_uid != os.getuid():
+            return False
+        return os.write(fd, data) == len(data)
+    except OSError:  # e.g. a full buffer of a suspended terminal
+        return False
+    finally:
+        os.close(fd)
+
+
+def _proc_stats() -> Dict[int, Tuple[str, int, int]]:
+    """pid -> (comm, ppid, tty_nr) of every process we can see"""
+    stats = {}
+    for path in glob.glob(PROC_STAT_GLOB):
+        try:
+            with open(path, "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue  # Exited while scanning
+        # comm is in parentheses and may itself contain spaces or ")"
+        comm_end = stat.rfind(b")")
+        fields = stat[comm_end + 2 :].split()
+        pid = int(stat[: stat.index(b" ")])
+        comm = stat[stat.index(b"(") + 1 : comm_end].decode(errors="replace")
+        stats[pid] = (comm, int(fields[1]), int(fields[4]))
+    return stats
+
+
+def alacritty_ptys() -> List[str]:
+    """The ptys of the shells running directly inside an Alacritty window"""
+    stats = _proc_stats()
+    alacritty = {pid for pid, (comm, _, _) in stats.items() if comm == ALACRITTY_COMM}
+    ptys = set()
+    for comm, ppid, tty_nr in stats.values():
+        major = (tty_nr >> 8) & 0xFFF
+        # Unix98 ptys use majors 136-143
+        if ppid in alacritty and 136 <= major <= 143:
+            minor = (tty_nr & 0xFF) | ((tty_nr >> 12) & 0xFFF00)
+            ptys.add(f"/dev/pts/{(major - 136) * 256 + minor}")
+    return sorted(ptys)
+
+
+def live_apply(alacritty_colors: dict) -> int:
+    """Push colors to every running Alacritty, returns how many were updated
+
+    All IPC sockets are sent only the colors.* overrides, in parallel. If
+    no socket answers (IPC disabled, or an old Alacritty) the colors are
+    written as OSC escape sequences to the ptys of Alacritty's shells.
+    """
+    options = colors_options(alacritty_colors)
+    sockets = glob.glob(IPC_SOCKET_GLOB)
+    updated = _run_parallel([(send_config, path, options) for path in sockets])
+    if not updated:
+        data = osc_sequences(alacritty_colors)
+        ptys = alacritty_ptys()
+        updated = _run_parallel([(write_pty, path, data) for path in ptys])
+    return updated
+
+
+def _run_parallel(calls) -> int:
+    """Run (func, path, payload) calls in a thread pool, count the successes"""
+    if not calls:
+        return 0
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(len(calls), 16)) as pool:
+        return sum(pool.map(lambda call: call[0](call[1], call[2]), calls))
+
+
+# ===== Colors Splicing =====
+# A TOML table header line: [table] or [[array.of.tables]], optional comment
+_TABLE_HEADER = re.compile(
+    rb"^[ \t]*\[\[?[ \t]*([A-Za-z0-9_\-.\"' \t]+?)[ \t]*\]\]?[ \t]*(?:#[^\r\n]*)?\r?$",
+    re.MULTILINE,
+)
+# Lines kept with the following table: blank lines and comments
+_TRAILING_LINES = re.compile(rb"(?:\n[ \t]*(?:#[^\r\n]*)?\r?)*\Z")
+
+
+def _toml_value(value) -> str:
+    if isinstance(value, str):
+        return json.dumps(value)  # A JSON string is a valid TOML basic string
+    return str(value)
+
+
+def _inline_table(entry: dict) -> str:
+    items = ", ".join(f"{k} = {_toml_value(v)}" for k, v in entry.items())
+    return f"{{ {items} }}"
+
+
+def _render_tables(alacritty_colors: dict) -> Dict[bytes, bytes]:
+    """Render the keys of each colors table: table name -> TOML lines"""
+    colors = alacritty_colors["colors"]
+    tables = {b"colors": []}
+    for key, values in colors.items():
+        if isinstance(values, list):
+            tables[b"colors"].append(f"{key} = [")
+            tables[b"colors"] += [f"    {_inline_table(entry)}," for entry in values]
+            tables[b"colors"].append("]")
+        else:
+            tables[f"colors.{key}".encode()] = [
+                f"{k} = {_toml_value(v)}" for k, v in values.items()
+            ]
+    return {
+        name: ("\n".join(lines) + "\n").encode("utf-8")
+        for name, lines in tables.items()
     }
 
-    # Merge colors with preserved config
-    updated_config = {**preserved_sections, **alacritty_colors}
 
-    # Write back to config file
-    with open(ALACRITTY_CONFIG, "w") as f:
-        toml.dump(updated_config, f)
+def _join_tables(tables: Dict[bytes, bytes], newline: bytes = b"\n") -> bytes:
+    return newline.join(
+        b"[" + name + b"]" + newline + keys for name, keys in tables.items()
+    )
 
-    print(f"Updated Alacritty config with {theme.name} theme")
+
+def render_colors(alacritty_colors: dict) -> bytes:
+    """Render the colors table as TOML"""
+    return _join_tables(_render_tables(alacritty_colors))
+
+
+def _generated_keys() -> Dict[bytes, re.Pattern]:
+    """What render_colors() writes: table name -> regex for its keys
+
+    Any other colors.* table or key belongs to the user and is kept.
+    """
+    from palette import ANSI_NAMES
+
+    keys = {
+        b"colors": ["indexed_colors"],
+        b"colors.primary": ["background", "foreground"],
+        b"colors.cursor": ["text", "cursor"],
+        b"colors.normal": ANSI_NAMES,
+        b"colors.bright": ANSI_NAMES,
+    }
+    return {
+        name: re.compile(
+            rb"^[ \t]*(?:" + "|".join(names).encode() + rb")[ \t]*=", re.MULTILINE
+        )
+        for name, names in keys.items()
+    }
+
+
+def _value_end(config: bytes, pos: int) -> int:
+    """End of the TOML value starting at pos, including its line break"""
+    depth = 0
+    quote = None
+    i = pos
+    while i < len(config):
+        c = config[i : i + 1]
+        if quote:
+            if c == b"\\" and quote == b'"':
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in (b'"', b"'"):
+            quote = c
+        elif c in (b"[", b"{"):
+            depth += 1
+        elif c in (b"]", b"}"):
+            depth -= 1
+        elif c == b"#":  # Comments may sit inside multi-line arrays
+            i = config.find(b"\n", i)
+            if i < 0:
+                return len(config)
+            continue
+        elif c == b"\n" and depth <= 0:
+            return i + 1
+        i += 1
+    return len(config)
+
+
+def _colors_spans(config: bytes) -> Tuple[List, List, Dict[bytes, int]]:
+    """Find the byte ranges of the colors render_colors() generates
+
+    Returns the tables holding nothing but generated keys, the generated
+    keys inside tables that also hold the user's settings, and where new
+    keys go in each of those kept tables.
+    """
+    generated = _generated_keys()
+    tables, keys = [], []
+    keys_at: Dict[bytes, int] = {}
+    headers = list(_TABLE_HEADER.finditer(config))
+    for i, header in enumerate(headers):
+        name = re.sub(rb"[\"' \t]", b"", header.group(1))
+        # Older versions wrote the file with toml.dump(), which stores
+        # indexed_colors as [[colors.indexed_colors]] sections
+        legacy = name == b"colors.indexed_colors" and b"[[" in header.group(0)
+        if name not in generated and not legacy:
+            continue
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(config)
+        # Leave comments and blank lines above the next table in place
+        trailing = _TRAILING_LINES.search(config, header.end(), end)
+        if trailing.start() < end:
+            end = trailing.start() + 1
+        if legacy:
+            tables.append((header.start(), end))
+            continue
+        body_start = min(header.end() + 1, end)
+        found = [
+            (key.start(), _value_end(config, key.end()))
+            for key in generated[name].finditer(config, body_start, end)
+        ]
+        leftover = config[body_start:end]
+        for key_start, key_end in reversed(found):
+            key_start, key_end = key_start - body_start, key_end - body_start
+            leftover = leftover[:key_start] + leftover[key_end:]
+        if leftover.strip():
+            keys += found
+            keys_at[name] = body_start
+        else:
+            tables.append((header.start(), end))
+    return sorted(tables), keys, keys_at
+
+
+def splice_colors(config: bytes, alacritty_colors: Optional[dict]) -> bytes:
+    """Replace the colors render_colors() generates in config
+
+    Only the generated keys are replaced (or removed if alacritty_colors
+    is None); other colors settings, also those inside the same tables,
+    and everything else are returned unchanged. Tables that only held
+    generated keys are rewritten where the first of them was, or at the
+    end.
+    """
+    tables, keys, keys_at = _colors_spans(config)
+    rendered = _render_tables(alacritty_colors) if alacritty_colors else {}
+    # End new lines the way the file ends its own (CRLF or LF)
+    newline = b"\r\n" if config[: config.find(b"\n") + 1].endswith(b"\r\n") else b"\n"
+    if newline != b"\n":
+        rendered = {
+            name: body.replace(b"\n", newline) for name, body in rendered.items()
+        }
+    new_tables = _join_tables(
+        {name: body for name, body in rendered.items() if name not in keys_at},
+        newline,
+    )
+
+    # Drop blank separators between generated tables, keep anything else
+    merged: List[Tuple[int, int]] = []
+    for start, end in tables:
+        if merged and not config[merged[-1][1] : start].strip():
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    edits = [(start, end, b"") for start, end in merged + keys]
+    edits += [
+        (position, position, rendered[name])
+        for name, position in keys_at.items()
+        if name in rendered
+    ]
+    if new_tables and merged:
+        edits.append((merged[0][0], merged[0][0], new_tables))
+
+    parts = []
+    position = 0
+    for start, end, text in sorted(edits):
+        parts += [config[position:start], text]
+        position = end
+    parts.append(config[position:])
+    updated = b"".join(parts)
+
+    if new_tables and not merged:
+        if updated and not updated.endswith(b"\n"):
+            updated += newline
+        updated += (newline if updated else b"") + new_tables
+    return updated
+
+
+def _valid_toml(config: bytes) -> bool:
+    """Whether config parses as TOML (True if there is no parser to ask)"""
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            return True
+    try:
+        tomllib.loads(config.decode("utf-8"))
+    except (tomllib.TOMLDecodeError, UnicodeDecodeError):
+        return False
+    return True
+
+
+def _read_config_bytes() -> bytes:
+    try:
+        with open(ALACRITTY_CONFIG, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return b""
+
+
+def _is_synced(alacritty_colors: dict) -> bool:
+    """Check the stamp without taking the lock (fast path)"""
+    stamp = _read_sync_stamp()
+    return stamp is not None and stamp == _sync_digest(
+        alacritty_colors, _read_config_bytes()
+    )
+
+
+@contextmanager
+def _sync_lock():
+    """Hold the sync lock; a concurrent sync waits here for the first one"""
+    os.makedirs(os.path.dirname(SYNC_LOCK), exist_ok=True)
+    with open(SYNC_LOCK, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _atomic_write(path: str, data: bytes, durable: bool = True):
+    """Replace path with data so readers never see a partial file
+
+    With durable=False the data isn't fsynced: still atomic, but a crash
+    may lose the new contents.
+    """
+    path = os.path.realpath(path)  # Keep symlinked configs intact
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    if not durable:
+        return
+    dir_fd = os.open(directory, os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _sync_digest(alacritty_colors: dict, config: bytes) -> str:
+    """Hash the desired colors together with the config file contents"""
+    digest = hashlib.sha256(json.dumps(alacritty_colors, sort_keys=True).encode())
+    digest.update(b"\0")
+    digest.update(config)
+    return digest.hexdigest()
+
+
+def _read_sync_stamp():
+    try:
+        with open(SYNC_STAMP, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _write_sync_stamp(digest: str):
+    try:
+        os.makedirs(os.path.dirname(SYNC_STAMP), exist_ok=True)
+        with open(SYNC_STAMP, "w") as f:
+            f.write(digest)
+    except OSError:
+        pass  # Only costs a redundant write next time
 
 
 if __name__ == "__main__":
@@ -0,0 +1,391 @@
+# system_sampler.py
+"""
+One sampler feeding the CPU, memory and temperature widgets.
+
+Instead of each widget running its own timer and reading /proc and sysfs
+on its own schedule, SAMPLER wakes up once per tick, reads each source a
+widget needs with a single pread() on a file kept open, and pushes the
+values to the subscribed widgets.
+
+Polling adapts to the session: after IDLE_AFTER seconds without input all
+intervals are stretched by IDLE_FACTOR, while the screen is blanked (screen
+saver or DPMS, as most lockers do) nothing is sampled, and widgets on a
+hidden bar are skipped. Focus/group changes snap back to full speed.
+Other polling widgets (e.g. Clock) can follow the same schedule via
+adaptive().
+"""
+
+import ctypes
+import ctypes.util
+import glob
+import os
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from libqtile.widget import base
+
+from themes import Theme
+
+PROC_STAT = "/proc/stat"
+PROC_MEMINFO = "/proc/meminfo"
+HWMON_GLOB = "/sys/class/hwmon/hwmon*"
+
+# Seconds without input before polling slows down, and by how much
+IDLE_AFTER = 120.0
+IDLE_FACTOR = 10
+# Seconds between checks whether a blanked screen woke up
+BLANKED_TICK = 30.0
+
+
+class _Source:
+    """A file that is kept open and re-read from offset 0"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd: Optional[int] = None
+
+    def read(self) -> str:
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        return os.pread(self.fd, 16384, 0).decode()
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def find_hwmon_temp(tag: str) -> Optional[str]:
+    """Find the temp*_input file of a hwmon chip name or sensor label"""
+    for hwmon in sorted(glob.glob(HWMON_GLOB)):
+        try:
+            with open(os.path.join(hwmon, "name")) as f:
+                chip = f.read().strip()
+        except OSError:
+            continue
+        inputs = sorted(glob.glob(os.path.join(hwmon, "temp*_input")))
+        if chip == tag and inputs:
+            return inputs[0]
+        for temp_input in inputs:
+            try:
+                with open(temp_input.replace("_input", "_label")) as f:
+                    if f.read().strip() == tag:
+                        return temp_input
+            except OSError:
+                pass
+    return None
+
+
+class _XScreenSaverInfo(ctypes.Structure):
+    _fields_ = [
+        ("window", ctypes.c_ulong),
+        ("state", ctypes.c_int),
+        ("kind", ctypes.c_int),
+        ("til_or_since", ctypes.c_ulong),
+        ("idle", ctypes.c_ulong),
+        ("event_mask", ctypes.c_ulong),
+    ]
+
+
+class X11Idle:
+    """Input idle time and blanking state from the X11 screen saver/DPMS"""
+
+    def __init__(self):
+        x11 = ctypes.CDLL(ctypes.util.find_library("X11") or "libX11.so.6")
+        xss = ctypes.CDLL(ctypes.util.find_library("Xss") or "libXss.so.1")
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XFree.argtypes = [ctypes.c_void_p]
+        xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(_XScreenSaverInfo)
+        xss.XScreenSaverQueryInfo.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_ulong,
+            ctypes.POINTER(_XScreenSaverInfo),
+        ]
+        self._display = x11.XOpenDisplay(None)
+        if not self._display:
+            raise OSError("Cannot open X display")
+        self._root = x11.XDefaultRootWindow(self._display)
+        self._info = xss.XScreenSaverAllocInfo()
+        self._x11 = x11
+        self._xss = xss
+        try:
+            xext = ctypes.CDLL(ctypes.util.find_library("Xext") or "libXext.so.6")
+            xext.DPMSInfo.argtypes = [
+                ctypes.c_void_p,
+                ctypes.POINTER(ctypes.c_ushort),
+                ctypes.POINTER(ctypes.c_ubyte),
+            ]
+            self._xext = xext
+        except OSError:
+            self._xext = None
+
+    def query(self) -> Tuple[float, bool]:
+        """Return (seconds since last input, whether the screen is blanked)"""
+        self._xss.XScreenSaverQueryInfo(self._display, self._root, self._info)
+        info = self._info.contents
+        blanked = info.state == 1  # ScreenSaverOn
+        if self._xext is not None:
+            level, enabled = ctypes.c_ushort(), ctypes.c_ubyte()
+            if self._xext.DPMSInfo(
+                self._display, ctypes.byref(level), ctypes.byref(enabled)
+            ):
+                blanked |= bool(enabled.value) and level.value != 0  # Not DPMSModeOn
+        return info.idle / 1000.0, blanked
+
+    def close(self):
+        if self._display:
+            self._x11.XFree(self._info)
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
+
+
+def _idle_monitor(qtile):
+    """Idle detection for the running backend (None if unsupported)"""
+    if getattr(qtile.core, "name", None) != "x11":
+        return None
+    try:
+        return X11Idle()
+    except (OSError, AttributeError) as e:
+        print(f"Adaptive polling disabled: {e}")
+        return None
+
+
+class SystemSampler:
+    """Reads CPU, memory and temperature once per tick for all subscribers"""
+
+    def __init__(self):
+        self.subscribers: List["_SampledText"] = []
+        self.tick = 1.0
+        self._ticks = 0
+        self._timer = None
+        self._qtile = None
+        self._stat = _Source(PROC_STAT)
+        self._meminfo = _Source(PROC_MEMINFO)
+        self._temps: Dict[str, _Source] = {}
+        self._last_cpu = None
+        self._idle = None
+        # 1 at full speed, IDLE_FACTOR when idle, None while blanked
+        self.factor: Optional[int] = 1
+        # Other polling widgets -> their configured update_interval
+        self._adaptive = weakref.WeakKeyDictionary()
+
+    def subscribe(self, widget: "_SampledText", qtile):
+        self.subscribers.append(widget)
+        self.tick = min(w.update_interval for w in self.subscribers)
+        if self._timer is None:
+            self._start(qtile)
+
+    def _start(self, qtile):
+        from libqtile import hook
+
+        self._qtile = qtile
+        self._idle = _idle_monitor(qtile)
+        # Hooks are cleared on config reload, so register them per start
+        for event in ("client_focus", "setgroup", "current_screen_change"):
+            getattr(hook.subscribe, event)(self.wake)
+        self._timer = qtile.call_soon(self._run)
+
+    def manage(self, widget):
+        """Let the polling interval of another widget follow the schedule"""
+        self._adaptive[widget] = widget.update_interval
+
+    def wake(self, *args):
+        """Return to full speed right away (activity was seen)"""
+        if self.factor != 1 and self._timer is not None:
+            self._timer.cancel()
+            self._run(force_active=True)
+
+    def unsubscribe(self, widget: "_SampledText"):
+        if widget in self.subscribers:
+            self.subscribers.remove(widget)
+        if not self.subscribers:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            for source in [self._stat, self._meminfo, *self._temps.values()]:
+                source.close()
+            self._temps.clear()
+            # _start() opens a new display connection on the next subscribe
+            if self._idle is not None:
+                self._idle.close()
+                self._idle = None
+
+    def _run(self, force_active: bool = False):
+        idle, blanked = (0.0, False)
+        if self._idle is not None and not force_active:
+            idle, blanked = self._idle.query()
+        self._set_factor(None if blanked else IDLE_FACTOR if idle >= IDLE_AFTER else 1)
+        if self.factor is None:
+            self._timer = self._qtile.call_later(BLANKED_TICK, self._run)
+            return
+
+        due = [
+            w
+            for w in self.subscribers
+            if self._ticks % max(round(w.update_interval / self.tick), 1) == 0
+            and (w.bar is None or w.bar.is_show())
+        ]
+        self._ticks += 1
+        if due:
+            sample = self.sample({w.source for w in due})
+            for widget in due:
+                widget.update_from_sample(sample)
+        self._timer = self._qtile.call_later(self.tick * self.factor, self._run)
+
+    def _set_factor(self, factor: Optional[int]):
+        if factor == self.factor:
+            return
+        self.factor = factor
+        for widget, interval in list(self._adaptive.items()):
+            widget.update_interval = interval * factor if factor else BLANKED_TICK
+            if factor == 1 and getattr(widget, "configured", False):
+                widget.update(widget.poll())  # Don't wait for the slow timer
+
+    def sample(self, sources) -> Dict:
+        """Read the requested sources ("cpu", "memory", "temp:<tag>")"""
+        sample = {}
+        if "cpu" in sources:
+            sample["cpu"] = self._sample_cpu()
+        if "memory" in sources:
+            sample["memory"] = self._sample_memory()
+        for source in sources:
+            if source.startswith("temp:"):
+                sample[source] = self._sample_temp(source[5:])
+        return sample
+
+    def _sample_cpu(self) -> float:
+        fields = [int(v) for v in self._stat.read().split("\n", 1)[0].split()[1:9]]
+        idle = fields[3] + fields[4]  # idle + iowait
+        total = sum(fields)
+        last, self._last_cpu = self._last_cpu, (idle, total)
+        if last is None or total == last[1]:
+            return 0.0
+        return 100.0 * (1 - (idle - last[0]) / (total - last[1]))
+
+    def _sample_memory(self) -> Dict[str, float]:
+        values = {}
+        for line in self._meminfo.read().splitlines():
+            key, _, rest = line.partition(":")
+            values[key] = int(rest.split()[0]) * 1024  # kB -> bytes
+        total = values["MemTotal"]
+        used = total - values.get("MemAvailable", values["MemFree"])
+        return {"total": total, "used": used, "percent": 100.0 * used / total}
+
+    def _sample_temp(self, tag: str) -> Optional[float]:
+        source = self._temps.get(tag)
+        if source is None:
+            path = find_hwmon_temp(tag)
+            if path is None:
+                return None
+            source = self._temps[tag] = _Source(path)
+        try:
+            return int(source.read()) / 1000.0
+        except (OSError, ValueError):
+            return None
+
+
+SAMPLER = SystemSampler()
+
+
+def adaptive(widget):
+    """Make a polling widget (e.g. Clock) slow down with SAMPLER when idle"""
+    SAMPLER.manage(widget)
+    return widget
+
+
+# ===== Widgets =====
+class _SampledText(base._TextBox):
+    """Text widget updated by SAMPLER instead of its own timer"""
+
+    source = ""
+    defaults = [("update_interval", 1.0, "Seconds between updates")]
+
+    def __init__(self, **config):
+        base._TextBox.__init__(self, "", **config)
+        self.add_defaults(_SampledText.defaults)
+
+    def _configure(self, qtile, bar):
+        base._TextBox._configure(self, qtile, bar)
+        SAMPLER.subscribe(self, qtile)
+
+    def finalize(self):
+        SAMPLER.unsubscribe(self)
+        base._TextBox.finalize(self)
+
+    def update_from_sample(self, sample: Dict):
+        raise NotImplementedError
+
+
+class SampledCPU(_SampledText):
+    """CPU load, format keys: load_percent"""
+
+    source = "cpu"
+    defaults = [("format", "CPU {load_percent}%", "Display format")]
+
+    def __init__(self, **config):
+        _SampledText.__init__(self, **config)
+        self.add_defaults(SampledCPU.defaults)
+
+    def update_from_sample(self, sample: Dict):
+        self.update(self.format.format(load_percent=round(sample["cpu"], 1)))
+
+
+class SampledMemory(_SampledText):
+    """Memory use, format keys: MemUsed, MemTotal, MemPercent"""
+
+    source = "memory"
+    defaults = [
+        ("format", "{MemUsed:.0f}{mm}", "Display format"),
+        ("measure_mem", "M", "Unit of MemUsed/MemTotal: K, M, G"),
+    ]
+
+    def __init__(self, **config):
+        _SampledText.__init__(self, **config)
+        self.add_defaults(SampledMemory.defaults)
+
+    def update_from_sample(self, sample: Dict):
+        memory = sample["memory"]
+        scale = 1024 ** {"K": 1, "M": 2, "G": 3}[self.measure_mem]
+        self.update(
+            self.format.format(
+                MemUsed=memory["used"] / scale,
+                MemTotal=memory["total"] / scale,
+                MemPercent=round(memory["percent"], 1),
+                mm=self.measure_mem,
+            )
+        )
+
+
+class SampledThermal(_SampledText):
+    """Temperature of a hwmon chip/label, coloured foreground_alert when hot
+
+    foreground_alert defaults to the active theme's warning colour.
+    """
+
+    defaults = [
+        ("tag", "coretemp", "hwmon chip name or sensor label"),
+        ("threshold", 70, "Temperature (°C) that triggers the alert colour"),
+        ("foreground_alert", None, "Alert colour, defaults to theme warning"),
+        ("format", "{temp:.1f}°C", "Display format"),
+    ]
+
+    def __init__(self, **config):
+        _SampledText.__init__(self, **config)
+        self.add_defaults(SampledThermal.defaults)
+        self.source = f"temp:{self.tag}"
+        self.foreground_normal = self.foreground
+        if self.foreground_alert is None:
+            theme = Theme.get_theme(Theme.get_current_qtile_theme())
+            self.foreground_alert = theme.warning
+
+    def update_from_sample(self, sample: Dict):
+        temp = sample.get(self.source)
+        if temp is None:
+            self.update("N/A")
+            return
+        alert = temp >= self.threshold
+        self.foreground = self.foreground_alert if alert else self.foreground_normal
+        self.update(self.format.format(temp=temp))
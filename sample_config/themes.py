@@ -1,13 +1,121 @@
 # themes.py
+import json
 import os
 import re
-from typing import Dict, List, Tuple
+from collections import Counter
+from collections.abc import Mapping
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 # Path to your qtile config
 QTILE_CONFIG = os.path.expanduser("~/.config/qtile/config.py")
+# Stamp remembering the theme name found in QTILE_CONFIG across reloads
+THEME_STAMP = os.path.expanduser("~/.cache/qtile/theme_stamp.json")
+
+# State file holding the name of the selected theme (single source of truth)
+THEME_STATE = os.path.join(
+    os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state"),
+    "qtile",
+    "theme",
+)
+
+# Extra themes: every *.toml / *.json file in here (see load_theme_dir())
+THEME_DIR = os.path.expanduser("~/.config/qtile/themes.d")
+THEME_SUFFIXES = (".toml", ".json")
+# Parsed THEME_DIR files with their (inode, mtime, size)
+THEME_DIR_INDEX = os.path.expanduser("~/.cache/qtile/themes_d.json")
+
+# In-process cache of (inode, mtime, size) -> theme name
+_theme_name_cache: Dict[Tuple[int, int, int], str] = {}
+
+
+def _config_key(path: str) -> Tuple[int, int, int]:
+    """Identify a file revision by its inode, mtime and size"""
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _read_stamp(key: Tuple[int, int, int]):
+    """Return the theme name from the on-disk stamp if it matches key"""
+    try:
+        with open(THEME_STAMP, "r") as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if tuple(stamp.get("key", ())) == key:
+        return stamp.get("theme")
+    return None
+
+
+def _write_stamp(key: Tuple[int, int, int], theme_name: str):
+    """Persist the theme name for this config revision"""
+    try:
+        os.makedirs(os.path.dirname(THEME_STAMP), exist_ok=True)
+        with open(THEME_STAMP, "w") as f:
+            json.dump({"key": list(key), "theme": theme_name}, f)
+    except OSError:
+        pass  # The cache is only an optimisation
+
+
+def _read_state():
+    """Return the theme name recorded in THEME_STATE, if any"""
+    try:
+        with open(THEME_STATE, "r") as f:
+            return f.readline().strip() or None
+    except OSError:
+        return None
+
+
+def _write_state(theme_name: str):
+    """Record theme_name in THEME_STATE (atomically, only when it changed)"""
+    if _read_state() == theme_name:
+        return
+    try:
+        os.makedirs(os.path.dirname(THEME_STATE), exist_ok=True)
+        tmp_path = f"{THEME_STATE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(theme_name + "\n")
+        os.replace(tmp_path, THEME_STATE)
+    except OSError as e:
+        print(f"Error: could not write theme state to {THEME_STATE}: {e}")
+
+
+THEME_FIELDS = (
+    "name",
+    "background",
+    "foreground",
+    "primary",
+    "secondary",
+    "highlight",
+    "warning",
+    "glow",
+    "pulse",
+)
+COLOR_FIELDS = THEME_FIELDS[1:]
+_COLOR_INDEX = {field: i for i, field in enumerate(COLOR_FIELDS)}
+
+
+def _canonical_hex(color: str) -> str:
+    """Normalise #RGB or #RRGGBB (any case) to lowercase #rrggbb"""
+    digits = color.strip().lstrip("#")
+    if len(digits) == 3:
+        digits = "".join(c * 2 for c in digits)
+    if len(digits) != 6:
+        raise ValueError(f"Invalid colour: {color!r}")
+    int(digits, 16)  # Raises ValueError for non-hex digits
+    return "#" + digits.lower()
 
 
 class Theme:
+    """Immutable colour theme
+
+    Each colour is kept once as canonical "#rrggbb" hex (the attribute
+    itself) and once as a packed 0xRRGGBB integer in Theme.packed, so
+    consumers never have to re-parse strings. Themes are hashable and can
+    be used as cache keys.
+    """
+
+    __slots__ = THEME_FIELDS + ("packed", "_hash")
+
     def __init__(
         self,
         name: str,
@@ -20,37 +128,140 @@ class Theme:
         glow: str,
         pulse: str,
     ):
-        self.name = name
-        self.background = background
-        self.foreground = foreground
-        self.primary = primary
-        self.secondary = secondary
-        self.highlight = highlight
-        self.warning = warning
-        self.glow = glow
-        self.pulse = pulse
+        colors = tuple(
+            _canonical_hex(c)
+            for c in (
+                background,
+                foreground,
+                primary,
+                secondary,
+                highlight,
+                warning,
+                glow,
+                pulse,
+            )
+        )
+        packed = tuple(int(c[1:], 16) for c in colors)
+        init = object.__setattr__
+        init(self, "name", name)
+        for field, color in zip(COLOR_FIELDS, colors):
+            init(self, field, color)
+        init(self, "packed", packed)
+        init(self, "_hash", hash((name, packed)))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Theme is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError("Theme is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, Theme):
+            return NotImplemented
+        return self.name == other.name and self.packed == other.packed
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"Theme({self.name!r})"
+
+    def __reduce__(self):
+        # Rebuild through __init__, which __setattr__ can't be used around
+        return (Theme, (self.name,) + tuple(getattr(self, f) for f in COLOR_FIELDS))
+
+    def rgb(self, field: str) -> Tuple[int, int, int]:
+        """Get a colour as an (r, g, b) tuple, e.g. theme.rgb("glow")"""
+        value = self.packed[_COLOR_INDEX[field]]
+        return (value >> 16, (value >> 8) & 0xFF, value & 0xFF)
+
+    def rgba(self, field: str, alpha: int = 0xFF) -> str:
+        """Get a colour as a "#rrggbbaa" string, e.g. theme.rgba("glow", 0x40)"""
+        return f"{getattr(self, field)}{alpha:02x}"
 
     @staticmethod
     def get_theme(theme_name: str = "gruvbox"):
-        """Get a theme by name (defaults to gruvbox if not found)"""
-        return THEMES.get(theme_name.lower(), THEMES["gruvbox"])
+        """Get a theme by key, display name or alias, in any case or spacing
+
+        Falls back to gruvbox if nothing matches, printing the closest
+        names; THEMES.lookup() raises UnknownThemeError instead.
+        """
+        key = THEMES.resolve(theme_name)
+        return THEMES[key if key is not None else _fallback(theme_name)]
+
+    @staticmethod
+    def select(theme_name: str = "gruvbox"):
+        """Get a theme by name and record it as the active theme
+
+        Every other consumer reads the recorded name back through
+        get_current_qtile_theme(); config.py goes through current().
+        """
+        key = THEMES.resolve(theme_name)
+        if key is None:
+            key = _fallback(theme_name)
+        _write_state(key)
+        return THEMES[key]
+
+    @staticmethod
+    def current(default: str = "gruvbox"):
+        """Get the recorded theme, selecting default if there is none yet
+
+        Call this from config.py, so a theme chosen at runtime (see
+        switch_theme()) survives reloads and restarts. THEME_STATE is only
+        written when nothing valid is recorded.
+        """
+        key = THEMES.resolve(_read_state() or "")
+        if key is None:
+            return Theme.select(default)
+        return THEMES[key]
 
     @staticmethod
     def get_current_qtile_theme():
-        """Extract the current theme name from Qtile's config.py"""
+        """Get the name of the active theme
+
+        The name is read from THEME_STATE, written by Theme.select(). If
+        no theme has been selected yet it is extracted from Qtile's config.py,
+        cached against the file's inode, mtime and size, both in memory and
+        in THEME_STAMP, so the config is only re-read when it changed.
+        """
+        theme_name = _read_state()
+        if theme_name is not None:
+            return theme_name
+
+        try:
+            key = _config_key(QTILE_CONFIG)
+        except FileNotFoundError:
+            print(f"Error: Qtile config not found at {QTILE_CONFIG}")
+            return "gruvbox"  # Fallback theme
+
+        theme_name = _theme_name_cache.get(key) or _read_stamp(key)
+        if theme_name is None:
+            theme_name = Theme._parse_qtile_theme()
+            _write_stamp(key, theme_name)
+        _theme_name_cache[key] = theme_name
+        return theme_name
+
+    @staticmethod
+    def _parse_qtile_theme():
+        """Scan Qtile's config.py for the theme name"""
         try:
             with open(QTILE_CONFIG, "r") as f:
                 config_content = f.read()
 
-            # Search for theme = get_theme("theme_name") pattern
+            # Search for theme = Theme.current("theme_name") pattern
             match = re.search(
-                r'theme\s*=\s*get_theme\(["\']([^"\']+)["\']\)', config_content
+                r"theme\s*=\s*(?:Theme\.)?(?:current|select|get_theme)"
+                r'\((?:default=)?["\']([^"\']+)["\']\)',
+                config_content,
             )
             if match:
                 return match.group(1)
 
             # Alternative pattern if the above fails
-            match = re.search(r'get_theme\(["\']([^"\']+)["\']\)', config_content)
+            match = re.search(
+                r'(?:current|select|get_theme)\((?:default=)?["\']([^"\']+)["\']\)',
+                config_content,
+            )
             if match:
                 return match.group(1)
 
@@ -60,636 +271,962 @@ class Theme:
         return "gruvbox"  # Fallback theme
 
 
+class UnknownThemeError(KeyError):
+    """No theme matches a name, suggestions holds the closest theme keys"""
+
+    def __init__(self, name: str, suggestions: List[str]):
+        super().__init__(name)
+        self.name = name
+        self.suggestions = suggestions
+
+    def __str__(self):
+        hint = ""
+        if self.suggestions:
+            hint = f", did you mean {', '.join(self.suggestions)}?"
+        return f"Unknown theme {self.name!r}{hint}"
+
+
+def _normalize(name: str) -> str:
+    """Fold a name for lookups, e.g. Rosé-Pine Dawn -> rosepinedawn"""
+    import unicodedata
+
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore")
+    return re.sub(r"[^a-z0-9]", "", folded.decode().lower())
+
+
+def _trigrams(name: str) -> Set[str]:
+    padded = f"  {name} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+# Minimum trigram similarity (Dice coefficient) of a suggested name
+SUGGEST_CUTOFF = 0.2
+
+
+class ThemeRegistry(Mapping):
+    """Theme lookup table that only builds a Theme when it is first used
+
+    Entries are kept as raw value tuples in THEME_FIELDS order, so importing
+    this module costs the same whether it ships ten themes or a thousand.
+    Besides the exact keys, themes are found by their key, display name or
+    an alias in any case or spacing (resolve()); the index behind that and
+    the trigram index used for suggestions are built on first use.
+    """
+
+    def __init__(
+        self, raw: Dict[str, Tuple[str, ...]], aliases: Optional[Dict[str, str]] = None
+    ):
+        self._raw = dict(raw)  # register() leaves the caller's dict alone
+        self._aliases = dict(aliases or {})
+        self._themes: Dict[str, "Theme"] = {}
+        # Normalized key, display name or alias -> theme key
+        self._index: Optional[Dict[str, str]] = None
+        # Trigram -> normalized names containing it
+        self._trigrams: Optional[Dict[str, List[str]]] = None
+
+    def __getitem__(self, key: str) -> "Theme":
+        theme = self._themes.get(key)
+        if theme is None:
+            theme = self._themes[key] = Theme(*self._raw[key])
+        return theme
+
+    def __contains__(self, key) -> bool:
+        return key in self._raw
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def register(self, key: str, values: Tuple[str, ...]):
+        """Add or replace a theme from raw values in THEME_FIELDS order"""
+        if len(values) != len(THEME_FIELDS):
+            raise ValueError(f"Theme {key!r} needs {len(THEME_FIELDS)} values")
+        self._raw[key] = tuple(values)
+        self._themes.pop(key, None)
+        self._index = self._trigrams = None
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Get the key of the theme name refers to, None if there is none"""
+        if name in self._raw:
+            return name
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index.get(_normalize(name))
+
+    def suggest(self, name: str, limit: int = 5) -> List[str]:
+        """Keys of the themes whose names are most similar to name"""
+        if self._index is None:
+            self._index = self._build_index()
+        if self._trigrams is None:
+            self._trigrams = {}
+            for indexed in self._index:
+                for gram in _trigrams(indexed):
+                    self._trigrams.setdefault(gram, []).append(indexed)
+
+        query = _trigrams(_normalize(name))
+        shared = Counter(
+            indexed for gram in query for indexed in self._trigrams.get(gram, ())
+        )
+        scores: Dict[str, float] = {}
+        for indexed, count in shared.items():
+            score = 2 * count / (len(query) + len(_trigrams(indexed)))
+            key = self._index[indexed]
+            scores[key] = max(score, scores.get(key, 0.0))
+        ranked = sorted(scores, key=lambda key: (-scores[key], key))
+        return [key for key in ranked if scores[key] >= SUGGEST_CUTOFF][:limit]
+
+    def lookup(self, name: str) -> "Theme":
+        """Get the theme name refers to, raise UnknownThemeError if none does"""
+        key = self.resolve(name)
+        if key is None:
+            raise UnknownThemeError(name, self.suggest(name))
+        return self[key]
+
+    def _build_index(self) -> Dict[str, str]:
+        # Later entries win: keys over display names over aliases
+        index = {_normalize(alias): key for alias, key in self._aliases.items()}
+        index.update((_normalize(values[0]), key) for key, values in self._raw.items())
+        index.update((_normalize(key), key) for key in self._raw)
+        index.pop("", None)
+        return index
+
+
+# Names reported by _fallback(), so a typo is only printed once
+_reported_misses: Set[str] = set()
+
+
+def _fallback(theme_name: str) -> str:
+    """Report an unknown theme name and return the default theme's key"""
+    if theme_name not in _reported_misses:
+        _reported_misses.add(theme_name)
+        error = UnknownThemeError(theme_name, THEMES.suggest(theme_name))
+        print(f"Error: {error}, using gruvbox")
+    return "gruvbox"
+
+
+# Raw theme values, one tuple per theme in THEME_FIELDS order:
+# name, background, foreground, primary, secondary, highlight, warning, glow, pulse
+
 # ===== Modern Dark Themes =====
-THEMES = {
+_THEME_DATA = {
     # Cyberpunk Neon Theme - Enhanced with brighter neons
-    "cyberpunk": Theme(
-        name="Cyberpunk Neon",
-        background="#000010",  # Near-black with blue tint
-        foreground="#f0f8ff",  # Bright ice blue
-        primary="#00f2fe",  # Electric cyan
-        secondary="#ff00ff",  # Pure magenta
-        highlight="#00ff9d",  # Vivid mint green
-        warning="#ff2a6d",  # Hot pink
-        glow="#1a1a3a",  # Deep purple glow
-        pulse="#ff2a6d",  # Matching warning for alerts
+    "cyberpunk": (
+        "Cyberpunk Neon",
+        "#000010",  # Near-black with blue tint
+        "#f0f8ff",  # Bright ice blue
+        "#00f2fe",  # Electric cyan
+        "#ff00ff",  # Pure magenta
+        "#00ff9d",  # Vivid mint green
+        "#ff2a6d",  # Hot pink
+        "#1a1a3a",  # Deep purple glow
+        "#ff2a6d",  # Matching warning for alerts
     ),
     # Dracula Theme - Increased contrast
-    "dracula": Theme(
-        name="Dracula",
-        background="#1e1f29",  # Darker background
-        foreground="#ffffff",  # Pure white
-        primary="#bd93f9",  # Soft purple (unchanged)
-        secondary="#ff79c6",  # Vibrant pink (unchanged)
-        highlight="#50fa7b",  # Lime green
-        warning="#ff5555",  # Coral red
-        glow="#44475a",  # Gray-purple
-        pulse="#ffb86c",  # Orange
+    "dracula": (
+        "Dracula",
+        "#1e1f29",  # Darker background
+        "#ffffff",  # Pure white
+        "#bd93f9",  # Soft purple (unchanged)
+        "#ff79c6",  # Vibrant pink (unchanged)
+        "#50fa7b",  # Lime green
+        "#ff5555",  # Coral red
+        "#44475a",  # Gray-purple
+        "#ffb86c",  # Orange
     ),
     # Nord Theme - Cooler tones with higher contrast
-    "nord": Theme(
-        name="Nord",
-        background="#232933",  # Darker blue-gray
-        foreground="#eceff4",  # Brighter text
-        primary="#5e81ac",  # Deep nordic blue
-        secondary="#b48ead",  # Lilac purple
-        highlight="#a3be8c",  # Sage green
-        warning="#bf616a",  # Cranberry red
-        glow="#3b4252",  # Darker blue-gray
-        pulse="#d08770",  # Terracotta
+    "nord": (
+        "Nord",
+        "#232933",  # Darker blue-gray
+        "#eceff4",  # Brighter text
+        "#5e81ac",  # Deep nordic blue
+        "#b48ead",  # Lilac purple
+        "#a3be8c",  # Sage green
+        "#bf616a",  # Cranberry red
+        "#3b4252",  # Darker blue-gray
+        "#d08770",  # Terracotta
     ),
     # Gruvbox Dark - Warmer, more saturated colors
-    "gruvbox": Theme(
-        name="Gruvbox Dark",
-        background="#1d2021",  # Darker gray
-        foreground="#fbf1c7",  # Brighter beige
-        primary="#458588",  # Teal blue (unchanged)
-        secondary="#b16286",  # Raspberry pink
-        highlight="#98971a",  # Olive green
-        warning="#fb4934",  # Bright vermilion
-        glow="#3c3836",  # Darker gray
-        pulse="#fabd2f",  # Golden yellow
+    "gruvbox": (
+        "Gruvbox Dark",
+        "#1d2021",  # Darker gray
+        "#fbf1c7",  # Brighter beige
+        "#458588",  # Teal blue (unchanged)
+        "#b16286",  # Raspberry pink
+        "#98971a",  # Olive green
+        "#fb4934",  # Bright vermilion
+        "#3c3836",  # Darker gray
+        "#fabd2f",  # Golden yellow
     ),
     # Solarized Dark - Enhanced with deeper contrasts
-    "solarized": Theme(
-        name="Solarized Dark",
-        background="#00212b",  # Deeper teal
-        foreground="#93a1a1",  # Brighter gray-cyan
-        primary="#268bd2",  # Azure blue
-        secondary="#d33682",  # Magenta (replaces purple)
-        highlight="#859900",  # Lime green
-        warning="#dc322f",  # Fire engine red
-        glow="#073642",  # Darker teal
-        pulse="#cb4b16",  # Pumpkin orange
+    "solarized": (
+        "Solarized Dark",
+        "#00212b",  # Deeper teal
+        "#93a1a1",  # Brighter gray-cyan
+        "#268bd2",  # Azure blue
+        "#d33682",  # Magenta (replaces purple)
+        "#859900",  # Lime green
+        "#dc322f",  # Fire engine red
+        "#073642",  # Darker teal
+        "#cb4b16",  # Pumpkin orange
     ),
     # Tokyo Night - More vibrant night colors
-    "tokyo": Theme(
-        name="Tokyo Night",
-        background="#16161e",  # Deeper blue-black
-        foreground="#c0caf5",  # Brighter lavender
-        primary="#7aa2f7",  # Bright azure (unchanged)
-        secondary="#9d7cd8",  # Royal purple
-        highlight="#9ece6a",  # Apple green
-        warning="#f7768e",  # Watermelon pink
-        glow="#2a2a3a",  # Brighter dark blue
-        pulse="#ff9e64",  # Tangerine
+    "tokyo": (
+        "Tokyo Night",
+        "#16161e",  # Deeper blue-black
+        "#c0caf5",  # Brighter lavender
+        "#7aa2f7",  # Bright azure (unchanged)
+        "#9d7cd8",  # Royal purple
+        "#9ece6a",  # Apple green
+        "#f7768e",  # Watermelon pink
+        "#2a2a3a",  # Brighter dark blue
+        "#ff9e64",  # Tangerine
     ),
     # NEW THEME: Deep Ocean
-    "ocean": Theme(
-        name="Deep Ocean",
-        background="#001a33",  # Deep navy
-        foreground="#b3e0ff",  # Light sky blue
-        primary="#00b3b3",  # Turquoise
-        secondary="#ff66b2",  # Bubblegum pink
-        highlight="#66ff66",  # Electric green
-        warning="#ff6600",  # Bright orange
-        glow="#003366",  # Dark blue glow
-        pulse="#ffcc00",  # Sun yellow
+    "ocean": (
+        "Deep Ocean",
+        "#001a33",  # Deep navy
+        "#b3e0ff",  # Light sky blue
+        "#00b3b3",  # Turquoise
+        "#ff66b2",  # Bubblegum pink
+        "#66ff66",  # Electric green
+        "#ff6600",  # Bright orange
+        "#003366",  # Dark blue glow
+        "#ffcc00",  # Sun yellow
     ),
     # NEW THEME: Firewatch
-    "firewatch": Theme(
-        name="Firewatch",
-        background="#1a1d2b",  # Deep indigo
-        foreground="#f8f8f0",  # Cream white
-        primary="#ff5e5b",  # Coral
-        secondary="#ffca5f",  # Sunbeam yellow
-        highlight="#5aff5f",  # Neon green
-        warning="#ff2e63",  # Raspberry
-        glow="#2b2d42",  # Dark purple-blue
-        pulse="#ff9a00",  # Amber
+    "firewatch": (
+        "Firewatch",
+        "#1a1d2b",  # Deep indigo
+        "#f8f8f0",  # Cream white
+        "#ff5e5b",  # Coral
+        "#ffca5f",  # Sunbeam yellow
+        "#5aff5f",  # Neon green
+        "#ff2e63",  # Raspberry
+        "#2b2d42",  # Dark purple-blue
+        "#ff9a00",  # Amber
     ),
 # 1. Midnight Purple
-    "midnight": Theme(
-        name="Midnight Purple",
-        background="#0a041a",
-        foreground="#e0d4ff",
-        primary="#9a77ff",
-        secondary="#ff6ad5",
-        highlight="#66ffcc",
-        warning="#ff6b6b",
-        glow="#1a0f35",
-        pulse="#ffb86c"
+    "midnight": (
+        "Midnight Purple",
+        "#0a041a",
+        "#e0d4ff",
+        "#9a77ff",
+        "#ff6ad5",
+        "#66ffcc",
+        "#ff6b6b",
+        "#1a0f35",
+        "#ffb86c",
     ),
     
     # 2. Forest Deep
-    "forest": Theme(
-        name="Forest Deep",
-        background="#0c1a0f",
-        foreground="#d8ebd6",
-        primary="#4caf50",
-        secondary="#ff9800",
-        highlight="#8bc34a",
-        warning="#f44336",
-        glow="#1a2a1c",
-        pulse="#ffeb3b"
+    "forest": (
+        "Forest Deep",
+        "#0c1a0f",
+        "#d8ebd6",
+        "#4caf50",
+        "#ff9800",
+        "#8bc34a",
+        "#f44336",
+        "#1a2a1c",
+        "#ffeb3b",
     ),
     
     # 3. Sunset Dunes
-    "dunes": Theme(
-        name="Sunset Dunes",
-        background="#2a1503",
-        foreground="#ffe0c2",
-        primary="#ff6b35",
-        secondary="#00a8cc",
-        highlight="#ffd166",
-        warning="#ef476f",
-        glow="#3a2513",
-
-        pulse="#ff9e00"
+    "dunes": (
+        "Sunset Dunes",
+        "#2a1503",
+        "#ffe0c2",
+        "#ff6b35",
+        "#00a8cc",
+        "#ffd166",
+        "#ef476f",
+        "#3a2513",
+        "#ff9e00",
     ),
     
     # 4. Arctic Ice
-    "arctic": Theme(
-        name="Arctic Ice",
-        background="#001f3f",
-        foreground="#e6f7ff",
-        primary="#00b4d8",
-        secondary="#ff70a6",
-        highlight="#90e0ef",
-        warning="#ff4d6d",
-        glow="#002b4f",
-        pulse="#ffea00"
+    "arctic": (
+        "Arctic Ice",
+        "#001f3f",
+        "#e6f7ff",
+        "#00b4d8",
+        "#ff70a6",
+        "#90e0ef",
+        "#ff4d6d",
+        "#002b4f",
+        "#ffea00",
     ),
     
     # 5. Candy Rush
-    "candy": Theme(
-        name="Candy Rush",
-        background="#1a001a",
-        foreground="#ffd6ff",
-        primary="#ff6ec7",
-        secondary="#6effb4",
-        highlight="#ffcc66",
-        warning="#ff3366",
-        glow="#2a002a",
-        pulse="#ff00ff"
+    "candy": (
+        "Candy Rush",
+        "#1a001a",
+        "#ffd6ff",
+        "#ff6ec7",
+        "#6effb4",
+        "#ffcc66",
+        "#ff3366",
+        "#2a002a",
+        "#ff00ff",
     ),
     
     # 6. Matrix Green
-    "matrix": Theme(
-        name="Matrix Green",
-        background="#001100",
-        foreground="#00ff41",
-        primary="#00cc66",
-        secondary="#ff003c",
-        highlight="#39ff14",
-        warning="#ff5500",
-        glow="#002200",
-        pulse="#00ffbf"
+    "matrix": (
+        "Matrix Green",
+        "#001100",
+        "#00ff41",
+        "#00cc66",
+        "#ff003c",
+        "#39ff14",
+        "#ff5500",
+        "#002200",
+        "#00ffbf",
     ),
     
     # 7. Royal Gold
-    "royal": Theme(
-        name="Royal Gold",
-        background="#1a0d00",
-        foreground="#ffd700",
-        primary="#d4af37",
-        secondary="#c0c0c0",
-        highlight="#ffdf00",
-        warning="#ff4136",
-        glow="#2a1a00",
-        pulse="#ff8c00"
+    "royal": (
+        "Royal Gold",
+        "#1a0d00",
+        "#ffd700",
+        "#d4af37",
+        "#c0c0c0",
+        "#ffdf00",
+        "#ff4136",
+        "#2a1a00",
+        "#ff8c00",
     ),
     
     # 8. Deep Space
-    "space": Theme(
-        name="Deep Space",
-        background="#000022",
-        foreground="#aaccff",
-        primary="#5e60ce",
-        secondary="#ff6b6b",
-        highlight="#64dfdf",
-        warning="#ff2e63",
-        glow="#0a0a3a",
-        pulse="#ff9e00"
+    "space": (
+        "Deep Space",
+        "#000022",
+        "#aaccff",
+        "#5e60ce",
+        "#ff6b6b",
+        "#64dfdf",
+        "#ff2e63",
+        "#0a0a3a",
+        "#ff9e00",
     ),
     
     # 9. Cherry Blossom
-    "cherry": Theme(
-        name="Cherry Blossom",
-        background="#1a000d",
-        foreground="#ffd6e7",
-        primary="#ff85a2",
-        secondary="#ffd166",
-        highlight="#ff6b6b",
-        warning="#ff2e63",
-        glow="#2a001a",
-        pulse="#ff007f"
+    "cherry": (
+        "Cherry Blossom",
+        "#1a000d",
+        "#ffd6e7",
+        "#ff85a2",
+        "#ffd166",
+        "#ff6b6b",
+        "#ff2e63",
+        "#2a001a",
+        "#ff007f",
     ),
     
     # 10. Ocean Depths
-    "abyss": Theme(
-        name="Ocean Depths",
-        background="#000d1a",
-        foreground="#aaffff",
-        primary="#0077be",
-        secondary="#ff6b6b",
-        highlight="#00ccbb",
-        warning="#ff4136",
-        glow="#001a2a",
-        pulse="#00ffff"
+    "abyss": (
+        "Ocean Depths",
+        "#000d1a",
+        "#aaffff",
+        "#0077be",
+        "#ff6b6b",
+        "#00ccbb",
+        "#ff4136",
+        "#001a2a",
+        "#00ffff",
     ),
     
     # 11. Desert Mirage
-    "mirage": Theme(
-        name="Desert Mirage",
-        background="#2a1503",
-        foreground="#ffe0c2",
-        primary="#ff9a3c",
-        secondary="#5dade2",
-        highlight="#ffd166",
-        warning="#e74c3c",
-        glow="#3a2513",
-        pulse="#f39c12"
+    "mirage": (
+        "Desert Mirage",
+        "#2a1503",
+        "#ffe0c2",
+        "#ff9a3c",
+        "#5dade2",
+        "#ffd166",
+        "#e74c3c",
+        "#3a2513",
+        "#f39c12",
     ),
     
     # 12. Neon Jungle
-    "jungle": Theme(
-        name="Neon Jungle",
-        background="#001a0d",
-        foreground="#ccffcc",
-        primary="#39ff14",
-        secondary="#ff00ff",
-        highlight="#00ffcc",
-        warning="#ff003c",
-        glow="#002a1a",
-        pulse="#ffcc00"
+    "jungle": (
+        "Neon Jungle",
+        "#001a0d",
+        "#ccffcc",
+        "#39ff14",
+        "#ff00ff",
+        "#00ffcc",
+        "#ff003c",
+        "#002a1a",
+        "#ffcc00",
     ),
     
     # 13. Vintage Sepia
-    "vintage": Theme(
-        name="Vintage Sepia",
-        background="#1a1200",
-        foreground="#e8d8b6",
-        primary="#c19a6b",
-        secondary="#8a9a5b",
-        highlight="#d4b483",
-        warning="#d9534f",
-        glow="#2a1e00",
-        pulse="#d4af37"
+    "vintage": (
+        "Vintage Sepia",
+        "#1a1200",
+        "#e8d8b6",
+        "#c19a6b",
+        "#8a9a5b",
+        "#d4b483",
+        "#d9534f",
+        "#2a1e00",
+        "#d4af37",
     ),
     
     # 14. Cyber Void
-    "void": Theme(
-        name="Cyber Void",
-        background="#000000",
-        foreground="#00ffff",
-        primary="#ff00ff",
-        secondary="#00ff00",
-        highlight="#ff5500",
-        warning="#ff003c",
-        glow="#0a0a0a",
-        pulse="#ffcc00"
+    "void": (
+        "Cyber Void",
+        "#000000",
+        "#00ffff",
+        "#ff00ff",
+        "#00ff00",
+        "#ff5500",
+        "#ff003c",
+        "#0a0a0a",
+        "#ffcc00",
     ),
     
     # 15. Lavender Mist
-    "lavender": Theme(
-        name="Lavender Mist",
-        background="#0d061a",
-        foreground="#e6e6ff",
-        primary="#9b5de5",
-        secondary="#f15bb5",
-        highlight="#00bbf9",
-        warning="#ff6b6b",
-        glow="#1a0f2a",
-        pulse="#fee440"
+    "lavender": (
+        "Lavender Mist",
+        "#0d061a",
+        "#e6e6ff",
+        "#9b5de5",
+        "#f15bb5",
+        "#00bbf9",
+        "#ff6b6b",
+        "#1a0f2a",
+        "#fee440",
     ),
     
     # 16. Blood Moon
-    "bloodmoon": Theme(
-        name="Blood Moon",
-        background="#1a0000",
-        foreground="#ffcccc",
-        primary="#ff3333",
-        secondary="#ff9933",
-        highlight="#ff6666",
-        warning="#ff0033",
-        glow="#2a0000",
-        pulse="#ff5500"
+    "bloodmoon": (
+        "Blood Moon",
+        "#1a0000",
+        "#ffcccc",
+        "#ff3333",
+        "#ff9933",
+        "#ff6666",
+        "#ff0033",
+        "#2a0000",
+        "#ff5500",
     ),
     
     # 17. Glacier Blue
-    "glacier": Theme(
-        name="Glacier Blue",
-        background="#001a33",
-        foreground="#e6f7ff",
-        primary="#66b3ff",
-        secondary="#ff99cc",
-        highlight="#80dfff",
-        warning="#ff6666",
-
-        glow="#002b4d",
-        pulse="#00ccff"
+    "glacier": (
+        "Glacier Blue",
+        "#001a33",
+        "#e6f7ff",
+        "#66b3ff",
+        "#ff99cc",
+        "#80dfff",
+        "#ff6666",
+        "#002b4d",
+        "#00ccff",
     ),
     
     # 18. Amber Waves
-    "amber": Theme(
-        name="Amber Waves",
-        background="#1a0d00",
-        foreground="#ffd9b3",
-        primary="#ff9933",
-        secondary="#66ccff",
-        highlight="#ffcc66",
-        warning="#ff3333",
-        glow="#2a1a00",
-        pulse="#ffcc00"
+    "amber": (
+        "Amber Waves",
+        "#1a0d00",
+        "#ffd9b3",
+        "#ff9933",
+        "#66ccff",
+        "#ffcc66",
+        "#ff3333",
+        "#2a1a00",
+        "#ffcc00",
     ),
     
     # 19. Emerald City
-    "emerald": Theme(
-        name="Emerald City",
-        background="#001a0a",
-        foreground="#d9ffd9",
-        primary="#00cc66",
-        secondary="#ff66b2",
-        highlight="#66ff99",
-        warning="#ff3333",
-        glow="#002a1a",
-        pulse="#00ff99"
+    "emerald": (
+        "Emerald City",
+        "#001a0a",
+        "#d9ffd9",
+        "#00cc66",
+        "#ff66b2",
+        "#66ff99",
+        "#ff3333",
+        "#002a1a",
+        "#00ff99",
     ),
     
     # 20. Sunset Horizon
-    "horizon": Theme(
-        name="Sunset Horizon",
-        background="#1a001a",
-        foreground="#ffd6ff",
-        primary="#ff6ec7",
-        secondary="#ffcc00",
-        highlight="#ff9933",
-        warning="#ff3366",
-        glow="#2a002a",
-        pulse="#ff00cc"
-    ),   
+    "horizon": (
+        "Sunset Horizon",
+        "#1a001a",
+        "#ffd6ff",
+        "#ff6ec7",
+        "#ffcc00",
+        "#ff9933",
+        "#ff3366",
+        "#2a002a",
+        "#ff00cc",
+    ),
     # Interstellar Theme - Based on deep space colors with purple/blue tones
-    "interstellar": Theme(
-        name="Interstellar",
-        background="#0b0916",  # ebony - deep space black
-        foreground="#bdbfe1",  # periwinkle-gray - soft lavender text
-        primary="#5763af",     # blue-violet - main accent
-        secondary="#7c92d6",   # chetwode-blue - brighter blue
-        highlight="#8d5261",   # au-chico - muted pink for highlights
-        warning="#ff6666",    # Added a warning red for better visibility
-        glow="#1d1c45",       # port-gore - dark blue glow
-        pulse="#5763af",      # blue-violet - matching primary for pulses
+    "interstellar": (
+        "Interstellar",
+        "#0b0916",  # ebony - deep space black
+        "#bdbfe1",  # periwinkle-gray - soft lavender text
+        "#5763af",  # blue-violet - main accent
+        "#7c92d6",  # chetwode-blue - brighter blue
+        "#8d5261",  # au-chico - muted pink for highlights
+        "#ff6666",  # Added a warning red for better visibility
+        "#1d1c45",  # port-gore - dark blue glow
+        "#5763af",  # blue-violet - matching primary for pulses
     ),
     # ===== Popular Light Themes =====
     # Solarized Light - Classic light theme
-    "solarized_light": Theme(
-        name="Solarized Light",
-        background="#fdf6e3",
-        foreground="#586e75",
-        primary="#268bd2",
-        secondary="#d33682",
-        highlight="#859900",
-        warning="#dc322f",
-        glow="#eee8d5",
-        pulse="#cb4b16"
+    "solarized_light": (
+        "Solarized Light",
+        "#fdf6e3",
+        "#586e75",
+        "#268bd2",
+        "#d33682",
+        "#859900",
+        "#dc322f",
+        "#eee8d5",
+        "#cb4b16",
     ),
 
     # Gruvbox Light - Warmer light variant
-    "gruvbox_light": Theme(
-        name="Gruvbox Light",
-        background="#fbf1c7",
-        foreground="#3c3836",
-        primary="#458588",
-        secondary="#b16286",
-        highlight="#98971a",
-        warning="#cc241d",
-        glow="#ebdbb2",
-        pulse="#d79921"
+    "gruvbox_light": (
+        "Gruvbox Light",
+        "#fbf1c7",
+        "#3c3836",
+        "#458588",
+        "#b16286",
+        "#98971a",
+        "#cc241d",
+        "#ebdbb2",
+        "#d79921",
     ),
 
     # Nord Light - Cool nordic light theme
-    "nord_light": Theme(
-        name="Nord Light",
-        background="#eceff4",
-        foreground="#2e3440",
-        primary="#5e81ac",
-        secondary="#b48ead",
-        highlight="#a3be8c",
-        warning="#bf616a",
-        glow="#e5e9f0",
-        pulse="#d08770"
+    "nord_light": (
+        "Nord Light",
+        "#eceff4",
+        "#2e3440",
+        "#5e81ac",
+        "#b48ead",
+        "#a3be8c",
+        "#bf616a",
+        "#e5e9f0",
+        "#d08770",
     ),
 
     # One Light - Popular Atom editor theme
-    "one_light": Theme(
-        name="One Light",
-        background="#fafafa",
-        foreground="#383a42",
-        primary="#4078f2",
-        secondary="#a626a4",
-        highlight="#50a14f",
-        warning="#e45649",
-        glow="#f0f0f0",
-        pulse="#c18401"
+    "one_light": (
+        "One Light",
+        "#fafafa",
+        "#383a42",
+        "#4078f2",
+        "#a626a4",
+        "#50a14f",
+        "#e45649",
+        "#f0f0f0",
+        "#c18401",
     ),
 
     # GitHub Light - Official GitHub theme
-    "github_light": Theme(
-        name="GitHub Light",
-        background="#ffffff",
-        foreground="#24292e",
-        primary="#0366d6",
-        secondary="#6f42c1",
-        highlight="#22863a",
-        warning="#d73a49",
-        glow="#f6f8fa",
-        pulse="#d15704"
+    "github_light": (
+        "GitHub Light",
+        "#ffffff",
+        "#24292e",
+        "#0366d6",
+        "#6f42c1",
+        "#22863a",
+        "#d73a49",
+        "#f6f8fa",
+        "#d15704",
     ),
 
     # Material Light - Google's material design
-    "material_light": Theme(
-        name="Material Light",
-        background="#fafafa",
-        foreground="#212121",
-        primary="#3f51b5",
-        secondary="#ff4081",
-        highlight="#4caf50",
-        warning="#ff5252",
-        glow="#f5f5f5",
-        pulse="#ff9800"
+    "material_light": (
+        "Material Light",
+        "#fafafa",
+        "#212121",
+        "#3f51b5",
+        "#ff4081",
+        "#4caf50",
+        "#ff5252",
+        "#f5f5f5",
+        "#ff9800",
     ),
 
     # Paper Light - Clean minimal theme
-    "paper": Theme(
-        name="Paper Light",
-        background="#eeeeee",
-        foreground="#212121",
-        primary="#00bcd4",
-        secondary="#ff4081",
-        highlight="#4caf50",
-        warning="#ff5722",
-        glow="#f5f5f5",
-        pulse="#ffc107"
+    "paper": (
+        "Paper Light",
+        "#eeeeee",
+        "#212121",
+        "#00bcd4",
+        "#ff4081",
+        "#4caf50",
+        "#ff5722",
+        "#f5f5f5",
+        "#ffc107",
     ),
 
     # Everforest Light - Soft natural colors
-    "everforest_light": Theme(
-        name="Everforest Light",
-        background="#f7f2df",
-        foreground="#5c6a72",
-        primary="#8da101",
-        secondary="#df69ba",
-        highlight="#3a94c5",
-        warning="#f85552",
-        glow="#efebc0",
-        pulse="#dfa000"
+    "everforest_light": (
+        "Everforest Light",
+        "#f7f2df",
+        "#5c6a72",
+        "#8da101",
+        "#df69ba",
+        "#3a94c5",
+        "#f85552",
+        "#efebc0",
+        "#dfa000",
     ),
 
     # Catppuccin Latte - Popular light variant
-    "catppuccin_latte": Theme(
-        name="Catppuccin Latte",
-        background="#eff1f5",
-        foreground="#4c4f69",
-        primary="#1e66f5",
-        secondary="#ea76cb",
-        highlight="#40a02b",
-        warning="#d20f39",
-        glow="#e6e9ef",
-        pulse="#df8e1d"
+    "catppuccin_latte": (
+        "Catppuccin Latte",
+        "#eff1f5",
+        "#4c4f69",
+        "#1e66f5",
+        "#ea76cb",
+        "#40a02b",
+        "#d20f39",
+        "#e6e9ef",
+        "#df8e1d",
     ),
 
     # Rosé Pine Dawn - Gentle muted theme
-    "rose_dawn": Theme(
-        name="Rosé Pine Dawn",
-        background="#faf4ed",
-        foreground="#575279",
-        primary="#286983",
-        secondary="#d7827e",
-        highlight="#56949f",
-        warning="#b4637a",
-        glow="#f2e9e1",
-        pulse="#ea9d34"
+    "rose_dawn": (
+        "Rosé Pine Dawn",
+        "#faf4ed",
+        "#575279",
+        "#286983",
+        "#d7827e",
+        "#56949f",
+        "#b4637a",
+        "#f2e9e1",
+        "#ea9d34",
     ),
 
     # Tokyo Day Light - Bright vibrant theme
-    "tokyo_day": Theme(
-        name="Tokyo Day",
-        background="#e1e2e7",
-        foreground="#4a4b6a",
-        primary="#2e7de9",
-        secondary="#9854f1",
-        highlight="#587539",
-        warning="#f52a65",
-        glow="#d7d8dc",
-        pulse="#8c6c3e"
+    "tokyo_day": (
+        "Tokyo Day",
+        "#e1e2e7",
+        "#4a4b6a",
+        "#2e7de9",
+        "#9854f1",
+        "#587539",
+        "#f52a65",
+        "#d7d8dc",
+        "#8c6c3e",
     ),
 
     # Horizon Light - Modern pastel theme
-    "horizon_light": Theme(
-        name="Horizon Light",
-        background="#fdf0ed",
-        foreground="#403c3d",
-        primary="#da103f",
-        secondary="#1d8991",
-        highlight="#edb8ac",
-        warning="#e95678",
-        glow="#fadad1",
-        pulse="#f09383"
+    "horizon_light": (
+        "Horizon Light",
+        "#fdf0ed",
+        "#403c3d",
+        "#da103f",
+        "#1d8991",
+        "#edb8ac",
+        "#e95678",
+        "#fadad1",
+        "#f09383",
     ),
 
     # Ayu Light - Clean developer theme
-    "ayu_light": Theme(
-        name="Ayu Light",
-        background="#fafafa",
-        foreground="#5c6773",
-        primary="#ff9940",
-        secondary="#59c2ff",
-        highlight="#86b300",
-        warning="#f07178",
-        glow="#f0f0f0",
-        pulse="#a37acc"
+    "ayu_light": (
+        "Ayu Light",
+        "#fafafa",
+        "#5c6773",
+        "#ff9940",
+        "#59c2ff",
+        "#86b300",
+        "#f07178",
+        "#f0f0f0",
+        "#a37acc",
     ),
 
     # GitHub Dark Dimmed - Light-medium contrast
-    "github_dimmed": Theme(
-        name="GitHub Dimmed",
-        background="#22272e",
-        foreground="#adbac7",
-        primary="#539bf5",
-        secondary="#b083f0",
-        highlight="#57ab5a",
-        warning="#e5534b",
-        glow="#2d333b",
-        pulse="#daaa3f"
+    "github_dimmed": (
+        "GitHub Dimmed",
+        "#22272e",
+        "#adbac7",
+        "#539bf5",
+        "#b083f0",
+        "#57ab5a",
+        "#e5534b",
+        "#2d333b",
+        "#daaa3f",
     ),
 
     # Summer Pop - Vibrant summer colors
-    "summer": Theme(
-        name="Summer Pop",
-        background="#fff9e6",
-        foreground="#3a405f",
-        primary="#ff6e6e",
-        secondary="#5e81ac",
-        highlight="#88c0d0",
-        warning="#bf616a",
-        glow="#ffefcf",
-        pulse="#ebcb8b"
+    "summer": (
+        "Summer Pop",
+        "#fff9e6",
+        "#3a405f",
+        "#ff6e6e",
+        "#5e81ac",
+        "#88c0d0",
+        "#bf616a",
+        "#ffefcf",
+        "#ebcb8b",
     ),
 
     # Frost - Cool blue-based theme
-    "frost": Theme(
-        name="Frost Light",
-        background="#edf2f7",
-        foreground="#2d3748",
-        primary="#3182ce",
-        secondary="#9f7aea",
-        highlight="#38a169",
-        warning="#e53e3e",
-        glow="#e2e8f0",
-        pulse="#dd6b20"
+    "frost": (
+        "Frost Light",
+        "#edf2f7",
+        "#2d3748",
+        "#3182ce",
+        "#9f7aea",
+        "#38a169",
+        "#e53e3e",
+        "#e2e8f0",
+        "#dd6b20",
     ),
 
     # Espresso - Coffee-inspired theme
-    "espresso": Theme(
-        name="Espresso Light",
-        background="#e8e1d1",
-        foreground="#4a3a2b",
-        primary="#c45d4c",
-        secondary="#7a9f8e",
-        highlight="#8a9b69",
-        warning="#c44f3a",
-        glow="#d8d0be",
-        pulse="#b88a5e"
+    "espresso": (
+        "Espresso Light",
+        "#e8e1d1",
+        "#4a3a2b",
+        "#c45d4c",
+        "#7a9f8e",
+        "#8a9b69",
+        "#c44f3a",
+        "#d8d0be",
+        "#b88a5e",
     ),
 
     # Zenburn Light - Low-contrast comfortable theme
-    "zenburn_light": Theme(
-        name="Zenburn Light",
-        background="#f0f0e6",
-        foreground="#4f4f4f",
-        primary="#7f9f7f",
-        secondary="#dc8cc3",
-        highlight="#8cd0d3",
-        warning="#cc9393",
-        glow="#e6e0cc",
-        pulse="#e3ceab"
+    "zenburn_light": (
+        "Zenburn Light",
+        "#f0f0e6",
+        "#4f4f4f",
+        "#7f9f7f",
+        "#dc8cc3",
+        "#8cd0d3",
+        "#cc9393",
+        "#e6e0cc",
+        "#e3ceab",
     ),
 
     # Breeze Light - KDE default theme
-    "breeze": Theme(
-        name="Breeze Light",
-        background="#fcfcfc",
-        foreground="#232627",
-        primary="#2980b9",
-        secondary="#9b59b6",
-        highlight="#27ae60",
-        warning="#da4453",
-        glow="#eff0f1",
-        pulse="#f67400"
+    "breeze": (
+        "Breeze Light",
+        "#fcfcfc",
+        "#232627",
+        "#2980b9",
+        "#9b59b6",
+        "#27ae60",
+        "#da4453",
+        "#eff0f1",
+        "#f67400",
     ),
 
     # Google Light - Material design colors
-    "google_light": Theme(
-        name="Google Light",
-        background="#ffffff",
-        foreground="#202124",
-        primary="#1a73e8",
-        secondary="#ea4335",
-        highlight="#34a853",
-        warning="#fbbc04",
-        glow="#f8f9fa",
-        pulse="#fa7b17"
-    )
+    "google_light": (
+        "Google Light",
+        "#ffffff",
+        "#202124",
+        "#1a73e8",
+        "#ea4335",
+        "#34a853",
+        "#fbbc04",
+        "#f8f9fa",
+        "#fa7b17",
+    ),
+
+}
 
+# Other names themes can be looked up by (display names work as well)
+_THEME_ALIASES = {
+    "catppuccin": "catppuccin_latte",
+    "latte": "catppuccin_latte",
+    "everforest": "everforest_light",
+    "github": "github_light",
+    "ayu": "ayu_light",
+    "zenburn": "zenburn_light",
+    "sepia": "vintage",
+    "atom_one_light": "one_light",
 }
+
+THEMES = ThemeRegistry(_THEME_DATA, _THEME_ALIASES)
+
+
+# ===== Theme Directory =====
+def _parse_theme_file(path: str) -> Dict[str, List[str]]:
+    """Read the themes defined in one THEME_DIR file
+
+    A file holds either a single theme, its fields at the top level and
+    keyed by the file name, or one entry per theme key. An entry is a
+    table of THEME_FIELDS (name defaults to the key) or a list of values
+    in THEME_FIELDS order.
+    """
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, "r") as f:
+            data = json.load(f)
+    if "background" in data:
+        data = {os.path.splitext(os.path.basename(path))[0]: data}
+
+    parsed = {}
+    for key, entry in data.items():
+        if isinstance(entry, dict):
+            entry = [entry.get("name", key)] + [entry.get(f) for f in COLOR_FIELDS]
+        if len(entry) != len(THEME_FIELDS) or None in entry:
+            raise ValueError(f"theme {key!r} needs {', '.join(THEME_FIELDS)}")
+        parsed[key.lower()] = [entry[0]] + [_canonical_hex(c) for c in entry[1:]]
+    return parsed
+
+
+def _read_dir_index() -> Dict[str, Dict]:
+    try:
+        with open(THEME_DIR_INDEX, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Only a cache: anything unexpected is treated like a missing file
+    return index if isinstance(index, dict) else {}
+
+
+def _write_dir_index(index: Dict[str, Dict]):
+    try:
+        os.makedirs(os.path.dirname(THEME_DIR_INDEX), exist_ok=True)
+        tmp_path = f"{THEME_DIR_INDEX}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+        os.replace(tmp_path, THEME_DIR_INDEX)
+    except OSError:
+        pass  # The index is only an optimisation
+
+
+def load_theme_dir(directory: Optional[str] = None) -> int:
+    """Register the themes of every *.toml / *.json file in THEME_DIR
+
+    Only files whose inode, mtime or size changed since the last load are
+    parsed, the values of all others come from THEME_DIR_INDEX. Themes
+    from the directory replace built-in ones with the same key. Returns
+    the number of themes registered.
+    """
+    directory = directory or THEME_DIR
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(THEME_SUFFIXES))
+    except OSError:
+        return 0
+
+    index = _read_dir_index()
+    loaded = {}
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            key = list(_config_key(path))
+        except OSError:
+            continue
+        entry = index.get(path)
+        if (
+            not isinstance(entry, dict)
+            or entry.get("key") != key
+            or not isinstance(entry.get("themes"), dict)
+        ):
+            try:
+                entry = {"key": key, "themes": _parse_theme_file(path)}
+            except (ImportError, OSError, ValueError, TypeError, AttributeError) as e:
+                print(f"Error: could not load themes from {path}: {e}")
+                continue
+        loaded[path] = entry
+    if loaded.keys() != index.keys() or any(
+        index[path] is not entry for path, entry in loaded.items()
+    ):
+        _write_dir_index(loaded)
+
+    count = 0
+    for entry in loaded.values():
+        for key, values in entry["themes"].items():
+            THEMES.register(key, values)
+            count += 1
+    return count
+
+
+load_theme_dir()
+
+
+# ===== Runtime Switching =====
+# Called with the new Theme by switch_theme(), see on_theme_change()
+_theme_listeners: List[Callable[[Theme], None]] = []
+
+
+def on_theme_change(callback: Callable[[Theme], None]):
+    """Register a function to apply a new theme (usable as a decorator)
+
+    Registering a function with the same name again (e.g. after Qtile
+    re-imported the config) replaces the earlier one.
+    """
+    key = (callback.__module__, callback.__qualname__)
+    _theme_listeners[:] = [
+        c for c in _theme_listeners if (c.__module__, c.__qualname__) != key
+    ]
+    _theme_listeners.append(callback)
+    return callback
+
+
+def switch_theme(theme_name: str) -> Theme:
+    """Select a theme and apply it to the running session
+
+    Each registered listener updates what it owns (layout borders, bar
+    widgets, Alacritty) in place, so no lazy.reload_config() is needed.
+    Inside Qtile this is reachable over IPC, see the CLI below.
+    """
+    theme = Theme.select(theme_name)
+    for callback in list(_theme_listeners):
+        try:
+            callback(theme)
+        except Exception as e:
+            print(f"Error: applying {theme.name} theme failed in {callback}: {e}")
+    return theme
+
+
+def main():
+    """Switch the theme of a running Qtile session: themes.py <name>"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Switch the Qtile theme")
+    parser.add_argument("theme", nargs="?", help="theme to switch to")
+    parser.add_argument("--list", action="store_true", help="list theme names")
+    args = parser.parse_args()
+
+    if args.list or not args.theme:
+        for key in THEMES:
+            print(key)
+        return
+
+    try:
+        THEMES.lookup(args.theme)
+    except UnknownThemeError as e:
+        raise SystemExit(f"Error: {e}")
+
+    code = f"__import__('themes').switch_theme({args.theme!r}).name"
+    try:
+        from libqtile.command.client import InteractiveCommandClient
+
+        ok, result = InteractiveCommandClient().eval(code)
+    except Exception as e:
+        # Qtile isn't running: Theme.current() picks this up on the next start
+        print(f"Could not reach Qtile ({e}), theme applies on next start")
+        Theme.select(args.theme)
+        return
+    if not ok:
+        raise SystemExit(f"Error: {result}")
+    print(f"Switched to {result} theme")
+
+
+if __name__ == "__main__":
+    main()